@@ -20,12 +20,17 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-from app.database.db import Base
+from app.database.db import Base, sync_url
 from app.models.client import Client
-from app.models.service import Service
-from app.models.service_level import ServiceLevel
+from app.models.service_type import ServiceType
+from app.models.urgency_level import UrgencyLevel
+from app.models.waste_type import WasteType
+from app.models.access_difficulty import AccessDifficulty
 from app.models.job import Job
 from app.models.invoice import Invoice
+from app.models.payment import Payment
+from app.models.geocode_cache import GeocodeCache
+from app.models.pricing_rule import PricingRuleSet, PricingRule
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -66,7 +71,8 @@ def run_migrations_online() -> None:
 
     """
     configuration = config.get_section(config.config_ini_section, {})
-    configuration["sqlalchemy.url"] = os.getenv("DATABASE_URL") or configuration.get("sqlalchemy.url")
+    # Migrations always run through the sync (psycopg2) driver
+    configuration["sqlalchemy.url"] = sync_url
     
     connectable = engine_from_config(
         configuration,
@@ -0,0 +1,37 @@
+"""add partial location index for nearest-available-crew lookups
+
+Revision ID: 5b9e21c7d4a0
+Revises: e3c847adf091
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e21c7d4a0'
+down_revision: Union[str, None] = 'e3c847adf091'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The crew table is owned by the crew backend and is not mapped here.
+    # Only available, approved crews are ever searched by location.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_crew_available_location",
+            "crew",
+            ["latitude", "longitude"],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'available' AND is_approved = true"),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_crew_available_location", table_name="crew", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,36 @@
+"""add index on clients.phone_number for identifier lookups
+
+Revision ID: 8d4f2a61c3b7
+Revises: 5b9e21c7d4a0
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2a61c3b7'
+down_revision: Union[str, None] = '5b9e21c7d4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches index=True on Client.phone_number. OTP and password-reset flows
+    # look clients up by email OR phone number, which needs both indexed.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_clients_phone_number",
+            "clients",
+            ["phone_number"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_clients_phone_number", table_name="clients", postgresql_concurrently=True, if_exists=True)
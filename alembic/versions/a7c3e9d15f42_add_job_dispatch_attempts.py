@@ -0,0 +1,30 @@
+"""add dispatch attempt bookkeeping to jobs
+
+Revision ID: a7c3e9d15f42
+Revises: 8d4f2a61c3b7
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9d15f42'
+down_revision: Union[str, None] = '8d4f2a61c3b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches Job.dispatch_attempts / Job.last_dispatch_at. The constant default
+    # makes adding the NOT NULL column a metadata-only change.
+    op.add_column("jobs", sa.Column("dispatch_attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("jobs", sa.Column("last_dispatch_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "last_dispatch_at")
+    op.drop_column("jobs", "dispatch_attempts")
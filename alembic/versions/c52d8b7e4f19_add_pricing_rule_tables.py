@@ -0,0 +1,53 @@
+"""add versioned pricing rule tables
+
+Revision ID: c52d8b7e4f19
+Revises: a7c3e9d15f42
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52d8b7e4f19'
+down_revision: Union[str, None] = 'a7c3e9d15f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches app/models/pricing_rule.py. Deployments that already started with
+    # these models have the tables from create_all, so each one is skipped if present.
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("pricing_rule_sets"):
+        op.create_table(
+            "pricing_rule_sets",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("version", sa.Integer(), nullable=False, unique=True),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("notes", sa.String(255)),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("activated_at", sa.DateTime()),
+        )
+
+    if not inspector.has_table("pricing_rules"):
+        op.create_table(
+            "pricing_rules",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("rule_set_id", sa.Integer(), sa.ForeignKey("pricing_rule_sets.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("category", sa.String(50), nullable=False),
+            sa.Column("key", sa.String(100), nullable=False),
+            sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+            sa.UniqueConstraint("rule_set_id", "category", "key", name="uq_pricing_rules_set_category_key"),
+        )
+        op.create_index("ix_pricing_rules_rule_set_id", "pricing_rules", ["rule_set_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pricing_rules_rule_set_id", table_name="pricing_rules", if_exists=True)
+    op.drop_table("pricing_rules")
+    op.drop_table("pricing_rule_sets")
@@ -0,0 +1,43 @@
+"""add indexes for hot job, payment and invoice access paths
+
+Revision ID: e3c847adf091
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3c847adf091'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) - kept in sync with __table_args__ on the models
+INDEXES = [
+    ("ix_jobs_client_id_created_at", "jobs", ["client_id", "created_at", "id"]),
+    ("ix_jobs_client_id_status_updated_at", "jobs", ["client_id", "status", "updated_at", "id"]),
+    ("ix_jobs_status_created_at", "jobs", ["status", "created_at"]),
+    ("ix_jobs_assigned_crew_id", "jobs", ["assigned_crew_id"]),
+    ("ix_payments_job_id_type_status", "payments", ["job_id", "payment_type", "payment_status"]),
+    ("ix_invoices_client_id_generated_at", "invoices", ["client_id", "generated_at", "id"]),
+    ("ix_invoices_job_id", "invoices", ["job_id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,66 +1,98 @@
 from sqlalchemy import text
-from app.core.location import haversine_distance
-import asyncio
+from app.core.location import haversine_distances, bounding_box
+from math import cos, radians
+import numpy as np
 
-async def auto_assign_crew(job_id: str, job_lat: float, job_lon: float, db):
-    """Auto-assign nearest available crew with retry logic"""
-    max_attempts = 5
-    attempt = 0
-    
-    while attempt < max_attempts:
-        # Get all available crews sorted by distance
-        result = db.execute(
-            text("""
-                SELECT id, latitude, longitude 
-                FROM crew 
-                WHERE status = 'available' 
-                AND is_approved = true 
-                AND latitude IS NOT NULL 
-                AND longitude IS NOT NULL
-            """)
-        ).fetchall()
-        
-        if not result:
-            # No available crews, wait and retry
-            attempt += 1
-            if attempt < max_attempts:
-                await asyncio.sleep(30)  # Wait 30 seconds before retry
-                continue
-            else:
-                return False
-        
-        # Sort crews by distance
-        crews_with_distance = []
-        for crew_id, crew_lat, crew_lon in result:
-            distance = haversine_distance(job_lat, job_lon, crew_lat, crew_lon)
-            crews_with_distance.append((crew_id, distance))
-        
-        crews_with_distance.sort(key=lambda x: x[1])
-        
-        # Try to assign to nearest crew
-        for crew_id, distance in crews_with_distance:
-            # Check if crew is still available
-            crew_check = db.execute(
-                text("SELECT status FROM crew WHERE id = :crew_id"),
-                {"crew_id": crew_id}
-            ).fetchone()
-            
-            if crew_check and crew_check[0] == 'available':
-                # Assign crew
-                db.execute(
-                    text("UPDATE jobs SET assigned_crew_id = :crew_id, status = 'crew_dispatched' WHERE id = :job_id"),
-                    {"crew_id": crew_id, "job_id": job_id}
-                )
-                db.execute(
-                    text("UPDATE crew SET status = 'assigned' WHERE id = :crew_id"),
-                    {"crew_id": crew_id}
-                )
-                db.commit()
-                return True
-        
-        # All crews became unavailable, retry
-        attempt += 1
-        if attempt < max_attempts:
-            await asyncio.sleep(30)
-    
-    return False
+# Search radii tried in turn; jobs with no crew inside the largest one wait for the next sweep
+CREW_SEARCH_RADII_KM = (10, 25, 50, 100, 250)
+# Most candidates returned for a claim to try, closest first
+CREW_CANDIDATES = 20
+# A radius is accepted once this many crews lie inside it
+CREW_MIN_CANDIDATES = 3
+
+NEAREST_CREWS_IN_BOX = text("""
+    SELECT id, email, full_name, latitude, longitude
+    FROM crew
+    WHERE status = 'available'
+    AND is_approved = true
+    AND latitude BETWEEN :min_lat AND :max_lat
+    AND longitude BETWEEN :min_lon AND :max_lon
+    ORDER BY (latitude - :lat) * (latitude - :lat)
+        + (longitude - :lon) * (longitude - :lon) * :lon_scale
+    LIMIT :candidates
+""")
+
+# Claims a crew for a job in one statement. The job row is locked first so two
+# claims for the same job serialise, and the crew is only taken if it is still
+# available when the UPDATE re-checks the row. Only jobs still at job_created
+# are claimed; one that has moved on to the quote workflow is left alone.
+# Returns no row if either lost.
+CLAIM_CREW = text("""
+    WITH target AS (
+        SELECT id FROM jobs
+        WHERE id = :job_id AND assigned_crew_id IS NULL AND status = 'job_created'
+        FOR UPDATE
+    ), claimed AS (
+        UPDATE crew SET status = 'assigned'
+        WHERE id = :crew_id
+        AND status = 'available'
+        AND is_approved = true
+        AND EXISTS (SELECT 1 FROM target)
+        RETURNING id, email, full_name
+    )
+    UPDATE jobs SET assigned_crew_id = CAST(claimed.id AS TEXT), status = 'crew_dispatched'
+    FROM claimed
+    WHERE jobs.id = :job_id
+    RETURNING claimed.id, claimed.email, claimed.full_name
+""")
+
+async def find_nearest_crews(db, lat: float, lon: float, limit: int = CREW_CANDIDATES, min_found: int = CREW_MIN_CANDIDATES):
+    """
+    Nearest available crews as (id, email, full_name, latitude, longitude, distance_km), closest first.
+
+    Each radius is a bounding-box range scan on the partial (latitude, longitude)
+    index. Only crews inside the search circle are returned, since anything
+    outside the box is further away than them, and the first radius with at
+    least min_found of them wins. The box query over-fetches, because its
+    ordering is only an approximation of the exact distance and the box corners
+    lie outside the circle. Crews beyond the largest radius are never returned.
+    """
+    params = {"lat": lat, "lon": lon, "lon_scale": cos(radians(lat)) ** 2, "candidates": 2 * limit}
+    min_found = min(min_found, limit)
+
+    nearby = []
+    for radius_km in CREW_SEARCH_RADII_KM:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        rows = (await db.execute(NEAREST_CREWS_IN_BOX, {
+            **params, "min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon
+        })).fetchall()
+        nearby = [crew for crew in _rank_by_distance(rows, lat, lon) if crew[5] <= radius_km]
+        if len(nearby) >= min_found:
+            break
+    return nearby[:limit]
+
+def _rank_by_distance(rows, lat, lon):
+    if not rows:
+        return []
+    distances = haversine_distances(lat, lon, [row[3] for row in rows], [row[4] for row in rows])
+    order = np.argsort(distances, kind="stable")
+    return [(*rows[i], float(distances[i])) for i in order]
+
+async def claim_crew(db, job_id: str, crew_id):
+    """
+    Atomically assign crew_id to an unassigned job and mark the crew as assigned.
+    Returns (id, email, full_name) of the crew, or None if the crew is no longer
+    available or the job already has a crew or is past job_created.
+    """
+    claimed = (await db.execute(CLAIM_CREW, {"job_id": job_id, "crew_id": crew_id})).fetchone()
+    # Commit either way so the job row lock is released straight away
+    await db.commit()
+    return claimed
+
+async def claim_nearest_crew(db, job_id: str, lat: float, lon: float, limit: int = CREW_CANDIDATES):
+    """Claim the nearest crew that is still available, or return None"""
+    for crew in await find_nearest_crews(db, lat, lon, limit=limit):
+        claimed = await claim_crew(db, job_id, crew[0])
+        if claimed:
+            return claimed
+    return None
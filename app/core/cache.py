@@ -0,0 +1,173 @@
+"""
+Small in-process caches shared by the core helpers
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache.
+
+    Entries may carry an absolute expiry (unix timestamp); an expired entry is
+    treated as a miss and dropped on access. `ttl` sets a default lifetime
+    for entries stored without an explicit expiry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[0] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskLRUCache:
+    """
+    Size-bounded LRU cache of files in one directory.
+
+    Each entry is stored as `<key>.<tag><suffix>`, where the tag identifies
+    the content (e.g. a storage ETag) so it survives restarts along with the
+    file. Files are written to a temporary name and renamed into place, so a
+    reader never sees a partial file. Recency is kept in memory and mirrored
+    to the file mtime; the index is rebuilt from the directory on first use.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._index: "Optional[OrderedDict[str, Tuple[str, str, int]]]" = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self._index is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not entry.is_file() or not name.endswith(self.suffix) or name.startswith("."):
+                continue
+            key, _, tag = name[:len(name) - len(self.suffix)].rpartition(".")
+            if key:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, key, tag, name, stat.st_size))
+        self._index = OrderedDict()
+        for _, key, tag, name, size in sorted(entries):
+            self._index[key] = (tag, name, size)
+            self._size += size
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """(path, tag) of a cached file, or None"""
+        with self._lock:
+            self._load()
+            entry = self._index.get(key)
+            if entry:
+                path = os.path.join(self.directory, entry[1])
+                if os.path.exists(path):
+                    self._index.move_to_end(key)
+                    self.hits += 1
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    return path, entry[0]
+                # Removed behind our back (another worker evicted it)
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, tag: str, chunks: Iterable[bytes]) -> str:
+        """Write a file atomically from `chunks` and return its path"""
+        with self._lock:
+            self._load()
+        name = f"{key}.{tag}{self.suffix}"
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            path = os.path.join(self.directory, name)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            old = self._index.get(key)
+            if old and old[1] != name:
+                self._remove_file(old[1])
+            self._drop(key)
+            self._index[key] = (tag, name, size)
+            self._size += size
+            while self._size > self.max_bytes and len(self._index) > 1:
+                oldest = next(iter(self._index))
+                self._remove_file(self._index[oldest][1])
+                self._drop(oldest)
+        return path
+
+    def _drop(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._size -= entry[2]
+
+    def _remove_file(self, name: str):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._index)
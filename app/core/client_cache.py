@@ -0,0 +1,102 @@
+"""
+Cached lookup of the authenticated client, shared by the client-facing routers
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.security import get_current_user
+from app.database.db import get_async_db
+from app.models.client import Client
+
+# Each worker has its own cache and only sees its own invalidations, so a
+# change made through another worker shows up here after at most this long
+CLIENT_CACHE_TTL = int(os.getenv("CLIENT_CACHE_TTL", "60"))
+CLIENT_CACHE_SIZE = int(os.getenv("CLIENT_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class ClientSnapshot:
+    """Read-only copy of a client's profile; passwords, OTPs and reset tokens are left out"""
+    id: uuid.UUID
+    email: str
+    full_name: Optional[str]
+    company_name: Optional[str]
+    contact_person_name: Optional[str]
+    department: Optional[str]
+    phone_number: Optional[str]
+    client_type: Optional[str]
+    business_address: Optional[str]
+    is_verified: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, client: Client) -> "ClientSnapshot":
+        return cls(
+            id=client.id,
+            email=client.email,
+            full_name=client.full_name,
+            company_name=client.company_name,
+            contact_person_name=client.contact_person_name,
+            department=client.department,
+            phone_number=client.phone_number,
+            client_type=client.client_type,
+            business_address=client.business_address,
+            is_verified=bool(client.is_verified),
+            created_at=client.created_at,
+        )
+
+
+class ClientCache:
+    """
+    Client snapshots by id, each trusted for `ttl` seconds.
+
+    Anything that changes a client's profile or verification must call
+    invalidate() after committing. Missing clients are not cached, so a newly
+    registered client is found on its first request.
+    """
+
+    def __init__(self, ttl: int = CLIENT_CACHE_TTL, maxsize: int = CLIENT_CACHE_SIZE):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, db, client_id) -> Optional[ClientSnapshot]:
+        key = str(client_id)
+        snapshot = self._cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        result = await db.execute(select(Client).where(Client.id == client_id))
+        client = result.scalars().first()
+        if not client:
+            return None
+        snapshot = ClientSnapshot.from_model(client)
+        self._cache.set(key, snapshot)
+        return snapshot
+
+    def invalidate(self, client_id=None):
+        if client_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(str(client_id))
+
+
+# Singleton instance
+client_cache = ClientCache()
+
+
+async def get_current_client(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> ClientSnapshot:
+    """The authenticated client, usually without touching the database"""
+    client = await client_cache.get(db, current_user.get("sub"))
+    if not client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return client
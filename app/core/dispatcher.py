@@ -0,0 +1,209 @@
+"""
+Background crew dispatcher: assigns the nearest available crew to new jobs outside the request
+"""
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select, text, update
+
+from app.core.auto_assign import claim_nearest_crew
+from app.database.db import AsyncSessionLocal
+from app.models.job import Job
+
+DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", "2"))
+DISPATCH_MAX_ATTEMPTS = int(os.getenv("DISPATCH_MAX_ATTEMPTS", "8"))
+DISPATCH_BASE_DELAY = float(os.getenv("DISPATCH_BASE_DELAY", "5"))
+DISPATCH_MAX_DELAY = float(os.getenv("DISPATCH_MAX_DELAY", "300"))
+# Unassigned jobs younger than this are re-queued by the periodic sweep
+DISPATCH_SWEEP_HOURS = int(os.getenv("DISPATCH_SWEEP_HOURS", "24"))
+DISPATCH_SWEEP_INTERVAL = float(os.getenv("DISPATCH_SWEEP_INTERVAL", "300"))
+# A job is swept again only this long after it was created or last swept,
+# which leaves time for the in-process retries of whoever queued it
+DISPATCH_SWEEP_RETRY_AFTER = float(os.getenv("DISPATCH_SWEEP_RETRY_AFTER", "1800"))
+# Sweeps per job before it is left for manual assignment
+DISPATCH_SWEEP_MAX_ATTEMPTS = int(os.getenv("DISPATCH_SWEEP_MAX_ATTEMPTS", "6"))
+DISPATCH_SWEEP_BATCH = int(os.getenv("DISPATCH_SWEEP_BATCH", "100"))
+# Advisory lock held for the length of a sweep, so one worker sweeps at a time
+DISPATCH_SWEEP_LOCK_ID = 7301
+
+
+@dataclass
+class DispatchRequest:
+    job_id: str
+    latitude: float
+    longitude: float
+    property_address: str
+    preferred_date: str
+    attempt: int = 0
+
+
+class CrewDispatcher:
+    """
+    Queue of jobs waiting for a crew, drained by a few worker tasks.
+
+    Each attempt opens its own session and closes it before any backoff, so a
+    job waiting for a crew never holds a connection. Jobs that run out of
+    attempts, or were queued by a process that has since restarted, are picked
+    up again by the periodic sweep of recent unassigned jobs. Every worker
+    process runs a sweeper, but an advisory lock lets only one sweep at a time,
+    and each job records its sweeps so it is retried at most every
+    DISPATCH_SWEEP_RETRY_AFTER seconds and DISPATCH_SWEEP_MAX_ATTEMPTS times.
+    """
+
+    def __init__(
+        self,
+        workers: int = DISPATCH_WORKERS,
+        max_attempts: int = DISPATCH_MAX_ATTEMPTS,
+        base_delay: float = DISPATCH_BASE_DELAY,
+        max_delay: float = DISPATCH_MAX_DELAY,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._retries = set()
+        self._queued = set()
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+        print(f"✅ Crew dispatcher started with {self.workers} workers")
+
+    async def stop(self):
+        if not self.running:
+            return
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+        self._tasks = []
+        self._retries.clear()
+        self._queued.clear()
+        print("✅ Crew dispatcher stopped")
+
+    def enqueue(self, request: DispatchRequest) -> bool:
+        """Queue a job for assignment. Returns False if the dispatcher is not running or the job is already queued."""
+        if not self.running or request.job_id in self._queued:
+            return False
+        self._queued.add(request.job_id)
+        self._queue.put_nowait(request)
+        return True
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.base_delay * 2 ** attempt, self.max_delay)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _worker(self):
+        while True:
+            request = await self._queue.get()
+            try:
+                await self._dispatch(request)
+            except Exception as e:
+                print(f"❌ Dispatch failed for job {request.job_id}: {e}")
+                self._schedule_retry(request)
+            finally:
+                self._queue.task_done()
+
+    async def _dispatch(self, request: DispatchRequest):
+        async with AsyncSessionLocal() as db:
+            crew = await claim_nearest_crew(db, request.job_id, request.latitude, request.longitude)
+            if not crew:
+                result = await db.execute(
+                    select(Job.assigned_crew_id, Job.status).where(Job.id == request.job_id)
+                )
+                job = result.first()
+                # Same condition as the claim and the sweep; anything else is dropped
+                if job and job.assigned_crew_id is None and job.status == "job_created":
+                    self._schedule_retry(request)
+                    return
+
+        self._queued.discard(request.job_id)
+        if crew:
+            print(f"✅ Job {request.job_id} assigned to crew {crew[0]}")
+            from app.core.email import send_job_assignment_email
+            try:
+                send_job_assignment_email(crew[1], crew[2], request.job_id, request.property_address, request.preferred_date)
+            except Exception as e:
+                print(f"Failed to send job assignment email: {e}")
+
+    def _schedule_retry(self, request: DispatchRequest):
+        request.attempt += 1
+        if request.attempt >= self.max_attempts:
+            self._queued.discard(request.job_id)
+            print(f"⚠️ No crew for job {request.job_id} after {request.attempt} attempts, leaving it for the sweep")
+            return
+        task = asyncio.create_task(self._requeue(request, self.backoff(request.attempt - 1)))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, request: DispatchRequest, delay: float):
+        await asyncio.sleep(delay)
+        if self.running:
+            self._queue.put_nowait(request)
+
+    async def _sweeper(self):
+        while True:
+            try:
+                queued = await self.sweep()
+                if queued:
+                    print(f"🔍 Dispatcher sweep queued {queued} unassigned jobs")
+            except Exception as e:
+                print(f"❌ Dispatcher sweep failed: {e}")
+            await asyncio.sleep(DISPATCH_SWEEP_INTERVAL)
+
+    async def sweep(self) -> int:
+        """Queue recent jobs that still have no crew, recording the attempt on each"""
+        now = datetime.utcnow()
+        due = (
+            select(Job.id)
+            .where(
+                Job.status == "job_created",
+                Job.created_at >= now - timedelta(hours=DISPATCH_SWEEP_HOURS),
+                Job.assigned_crew_id.is_(None),
+                Job.latitude.isnot(None),
+                Job.longitude.isnot(None),
+                Job.dispatch_attempts < DISPATCH_SWEEP_MAX_ATTEMPTS,
+                func.coalesce(Job.last_dispatch_at, Job.created_at) < now - timedelta(seconds=DISPATCH_SWEEP_RETRY_AFTER),
+            )
+            .order_by(Job.created_at)
+            .limit(DISPATCH_SWEEP_BATCH)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            # Released when the transaction ends; another worker's sweep is already running otherwise
+            locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": DISPATCH_SWEEP_LOCK_ID})
+            if not locked:
+                return 0
+            result = await db.execute(
+                update(Job)
+                .where(Job.id.in_(due.scalar_subquery()))
+                # Bookkeeping only, so updated_at is left as it was
+                .values(dispatch_attempts=Job.dispatch_attempts + 1, last_dispatch_at=now, updated_at=Job.updated_at)
+                .returning(Job.id, Job.latitude, Job.longitude, Job.property_address, Job.preferred_date, Job.dispatch_attempts)
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            await db.commit()
+
+        for row in rows:
+            if row.dispatch_attempts >= DISPATCH_SWEEP_MAX_ATTEMPTS:
+                print(f"⚠️ Last sweep for job {row.id}; it needs a crew assigned manually if this one fails")
+        return sum(self.enqueue(DispatchRequest(*row[:5])) for row in rows)
+
+
+# Singleton instance
+crew_dispatcher = CrewDispatcher()
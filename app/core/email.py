@@ -1,8 +1,14 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import asyncio
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load .env from project root
@@ -13,13 +19,208 @@ if ENV_FILE.exists():
 else:
     load_dotenv(override=True)
 
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+# Idle connections older than this are checked with NOOP before reuse
+SMTP_IDLE_CHECK = float(os.getenv("SMTP_IDLE_CHECK", "30"))
+EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", "1000"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_DRAIN_TIMEOUT = float(os.getenv("EMAIL_DRAIN_TIMEOUT", "10"))
+
+
+def _smtp_settings():
+    return {
+        "server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+        "port": int(os.getenv("SMTP_PORT", "587")),
+        "user": os.getenv("SMTP_USER", ""),
+        "password": os.getenv("SMTP_PASSWORD", ""),
+        "starttls": os.getenv("SMTP_STARTTLS", "true").lower() == "true",
+        # Set for a relay or local SMTP stand-in that takes mail without LOGIN
+        "no_auth": os.getenv("SMTP_NO_AUTH", "false").lower() == "true",
+    }
+
+
+def email_configured() -> bool:
+    settings = _smtp_settings()
+    return bool(settings["user"] and (settings["password"] or settings["no_auth"]))
+
+
+class SMTPPool:
+    """
+    Up to `size` SMTP connections kept open between sends.
+
+    STARTTLS and LOGIN run once per connection instead of once per email.
+    Connections are checked out by one thread at a time and dropped on any
+    SMTP error so the next checkout reconnects.
+    """
+
+    def __init__(self, size: int = SMTP_POOL_SIZE):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        settings = _smtp_settings()
+        server = smtplib.SMTP(settings["server"], settings["port"], timeout=SMTP_TIMEOUT)
+        try:
+            if settings["starttls"]:
+                server.starttls()
+            if settings["password"]:
+                server.login(settings["user"], settings["password"])
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    def _is_alive(self, server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        server = None
+        try:
+            try:
+                server, last_used = self._idle.get_nowait()
+                if time.monotonic() - last_used > SMTP_IDLE_CHECK and not self._is_alive(server):
+                    self._close(server)
+                    server = None
+            except queue.Empty:
+                pass
+            if server is None:
+                server = self._connect()
+
+            yield server
+            self._idle.put((server, time.monotonic()))
+        except Exception:
+            if server is not None:
+                self._close(server)
+            raise
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(server)
+
+    def _close(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+class MailSender:
+    """
+    Bounded queue of outgoing emails drained by background tasks.
+
+    Each worker takes up to EMAIL_BATCH_SIZE queued messages and sends them
+    over one pooled connection on a worker thread. When the sender is not
+    running (scripts, tests) messages are delivered synchronously instead.
+    """
+
+    def __init__(self, pool: SMTPPool = None, maxsize: int = EMAIL_QUEUE_SIZE, batch_size: int = EMAIL_BATCH_SIZE):
+        self.pool = pool or SMTPPool()
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool.size)]
+        print(f"✅ Mail sender started with {self.pool.size} SMTP connections")
+
+    async def stop(self, timeout: float = EMAIL_DRAIN_TIMEOUT):
+        """Send whatever is still queued (up to `timeout` seconds), then close the pool"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Mail sender stopped with {self._queue.qsize()} emails unsent")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+        await asyncio.to_thread(self.pool.close)
+        print("✅ Mail sender stopped")
+
+    def send(self, msg: MIMEMultipart, label: str = "Email"):
+        """Queue one message; raises asyncio.QueueFull if the queue is full"""
+        if not self.running:
+            self.deliver([(msg, label)])
+            return
+        self._queue.put_nowait((msg, label))
+
+    def send_many(self, messages: Iterable[Tuple[MIMEMultipart, str]]):
+        for msg, label in messages:
+            self.send(msg, label)
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await asyncio.to_thread(self.deliver, batch)
+            except Exception as e:
+                print(f"Failed to send {len(batch)} emails: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def deliver(self, batch: List[Tuple[MIMEMultipart, str]]):
+        """Send a batch over one pooled connection, reconnecting once if the server dropped it"""
+        pending = list(batch)
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as server:
+                    while pending:
+                        msg, label = pending[0]
+                        try:
+                            server.send_message(msg)
+                            print(f"{label} sent to {msg['To']}")
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                            # Refused by the server for this message only; the rest of the batch still goes
+                            print(f"Failed to send {label.lower()} to {msg['To']}: {e}")
+                        pending.pop(0)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                if attempt:
+                    raise
+
+
+def _build_message(to: str, subject: str, body: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg['From'] = _smtp_settings()["user"]
+    msg['To'] = to
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
 def send_otp_email(email: str, otp: str):
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER", "")
-    smtp_password = os.getenv("SMTP_PASSWORD", "")
-    
-    if not smtp_user or not smtp_password:
+    if not email_configured():
         print("Email not configured. Skipping OTP email.")
         return
     
@@ -34,30 +235,10 @@ def send_otp_email(email: str, otp: str):
     Please enter this OTP to verify your account and access the dashboard.
     """
     
-    msg = MIMEMultipart()
-    msg['From'] = smtp_user
-    msg['To'] = email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-    
-    try:
-        server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)  # Add 10 second timeout
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        server.send_message(msg)
-        server.quit()
-        print(f"OTP sent to {email}")
-    except Exception as e:
-        print(f"Failed to send OTP email: {e}")
-        raise  # Re-raise to let caller handle
+    mail_sender.send(_build_message(email, subject, body), "OTP")
 
 def send_password_reset_email(email: str, reset_token: str):
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER", "")
-    smtp_password = os.getenv("SMTP_PASSWORD", "")
-    
-    if not smtp_user or not smtp_password:
+    if not email_configured():
         print("Email not configured. Skipping password reset email.")
         return
     
@@ -80,29 +261,10 @@ def send_password_reset_email(email: str, reset_token: str):
     Emergency Property Clearance Team
     """
     
-    msg = MIMEMultipart()
-    msg['From'] = smtp_user
-    msg['To'] = email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-    
-    try:
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        server.send_message(msg)
-        server.quit()
-        print(f"Password reset email sent to {email}")
-    except Exception as e:
-        print(f"Failed to send password reset email: {e}")
+    mail_sender.send(_build_message(email, subject, body), "Password reset email")
 
 def send_job_assignment_email(crew_email: str, crew_name: str, job_id: str, address: str, scheduled_date: str):
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER", "")
-    smtp_password = os.getenv("SMTP_PASSWORD", "")
-    
-    if not smtp_user or not smtp_password:
+    if not email_configured():
         return
     
     subject = "New Job Assigned"
@@ -119,17 +281,8 @@ Please log in to view details.
 Best regards,
 Emergency Property Clearance Team"""
     
-    msg = MIMEMultipart()
-    msg['From'] = smtp_user
-    msg['To'] = crew_email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-    
-    try:
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        server.send_message(msg)
-        server.quit()
-    except:
-        pass
+    mail_sender.send(_build_message(crew_email, subject, body), "Job assignment email")
+
+
+# Singleton instance
+mail_sender = MailSender()
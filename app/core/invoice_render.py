@@ -0,0 +1,111 @@
+"""
+Invoice PDF rendering, one at a time or in batches on a process pool
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+INVOICE_RENDER_WORKERS = int(os.getenv("INVOICE_RENDER_WORKERS", "0")) or os.cpu_count() or 1
+# Batches smaller than this are rendered in the calling process
+INVOICE_RENDER_MIN_BATCH = int(os.getenv("INVOICE_RENDER_MIN_BATCH", "16"))
+
+
+@dataclass(frozen=True)
+class InvoiceData:
+    """Plain copy of the fields printed on an invoice, safe to send to worker processes"""
+    invoice_id: str
+    invoice_number: str
+    job_id: str
+    date: str
+    client_name: str
+    company_name: str
+    email: str
+    amount: float
+
+    @classmethod
+    def from_models(cls, invoice, client) -> "InvoiceData":
+        return cls(
+            invoice_id=str(invoice.id),
+            invoice_number=invoice.invoice_number,
+            job_id=str(invoice.job_id),
+            date=invoice.generated_at.strftime('%Y-%m-%d'),
+            client_name=f"{client.full_name}",
+            company_name=f"{client.company_name}",
+            email=f"{client.email}",
+            amount=float(invoice.amount),
+        )
+
+
+def render_invoice_pdf(data: InvoiceData) -> bytes:
+    """Render one invoice to PDF bytes"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    # Title
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(50, height - 50, "INVOICE")
+
+    # Invoice details
+    c.setFont("Helvetica", 12)
+    c.drawString(50, height - 100, f"Invoice Number: {data.invoice_number}")
+    c.drawString(50, height - 120, f"Job ID: {data.job_id}")
+    c.drawString(50, height - 140, f"Date: {data.date}")
+
+    # Client details
+    c.drawString(50, height - 180, "Bill To:")
+    c.drawString(50, height - 200, data.client_name)
+    c.drawString(50, height - 220, data.company_name)
+    c.drawString(50, height - 240, data.email)
+
+    # Amount
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, height - 300, f"Total Amount: £{data.amount:.2f}")
+
+    # Footer
+    c.setFont("Helvetica", 10)
+    c.drawString(50, 50, "Thank you for your business!")
+
+    c.save()
+    return buffer.getvalue()
+
+
+def render_invoices(invoices: Iterable[InvoiceData], workers: Optional[int] = None) -> List[bytes]:
+    """
+    Render many invoices, in input order.
+
+    Large batches are spread over a process pool since rendering is CPU-bound;
+    small ones are not worth the cost of starting the workers.
+    """
+    invoices = list(invoices)
+    workers = workers or INVOICE_RENDER_WORKERS
+    if workers <= 1 or len(invoices) < INVOICE_RENDER_MIN_BATCH:
+        return [render_invoice_pdf(data) for data in invoices]
+
+    chunksize = max(1, len(invoices) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_invoice_pdf, invoices, chunksize=chunksize))
+
+
+def render_and_upload_invoices(invoices: Iterable[Tuple[object, object]], workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """
+    Render (invoice, client) pairs and upload the PDFs concurrently.
+
+    Returns the storage URL per invoice id, or None where the upload failed.
+    Callers save the URLs to Invoice.pdf_path.
+    """
+    from app.core.storage import storage
+
+    pairs = list(invoices)
+    data = [InvoiceData.from_models(invoice, client) for invoice, client in pairs]
+    pdfs = render_invoices(data, workers)
+    urls = storage.upload_many([
+        (io.BytesIO(pdf), f"invoices/{client.id}", f"{item.invoice_number}.pdf")
+        for (_, client), item, pdf in zip(pairs, data, pdfs)
+    ])
+    return {item.invoice_id: url for item, url in zip(data, urls)}
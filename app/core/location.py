@@ -1,16 +1,73 @@
 from geopy.geocoders import Nominatim
-from math import radians, sin, cos, sqrt, atan2
+from math import radians, degrees, sin, cos, sqrt, atan2
+from sqlalchemy.dialects.postgresql import insert
+from app.core.cache import LRUCache
+from app.models.geocode_cache import GeocodeCache
+import asyncio
+import numpy as np
+import os
+import re
+
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "4096"))
+GEOCODE_TIMEOUT = float(os.getenv("GEOCODE_TIMEOUT", "1"))
+
+UK_POSTCODE_RE = re.compile(r"\b([A-Z]{1,2}\d[A-Z\d]?)\s*(\d[A-Z]{2})\b")
+
+_geolocator = None
+_geocode_cache = LRUCache(maxsize=GEOCODE_CACHE_SIZE)
+
+def _get_geolocator():
+    global _geolocator
+    if _geolocator is None:
+        _geolocator = Nominatim(user_agent="emergency_clearance", timeout=GEOCODE_TIMEOUT)
+    return _geolocator
+
+def normalise_address(address: str) -> str:
+    """Cache key for an address: upper-cased, punctuation-free, single-spaced, postcode as 'AA9A 9AA'"""
+    text = re.sub(r"[^A-Z0-9 ]", " ", address.upper())
+    text = UK_POSTCODE_RE.sub(lambda m: f"{m.group(1)} {m.group(2)}", text)
+    return " ".join(text.split())[:255]
 
 def geocode_address(address: str):
     try:
-        geolocator = Nominatim(user_agent="emergency_clearance")
-        location = geolocator.geocode(address)
+        location = _get_geolocator().geocode(address)
         if location:
             return location.latitude, location.longitude
     except:
         pass
     return None, None
 
+async def geocode_address_async(address: str, db):
+    """
+    Geocode through the in-memory LRU, then the geocode_cache table, and only
+    then the geocoder itself, which runs on a worker thread so a slow lookup
+    does not hold up the event loop.
+    """
+    key = normalise_address(address)
+    cached = _geocode_cache.get(key)
+    if cached:
+        return cached
+
+    row = await db.get(GeocodeCache, key)
+    if row:
+        cached = (row.latitude, row.longitude)
+        _geocode_cache.set(key, cached)
+        return cached
+
+    lat, lon = await asyncio.to_thread(geocode_address, address)
+    if lat is None or lon is None:
+        return None, None
+
+    _geocode_cache.set(key, (lat, lon))
+    # Another request may have stored the same address first
+    await db.execute(
+        insert(GeocodeCache)
+        .values(address_key=key, latitude=lat, longitude=lon)
+        .on_conflict_do_nothing(index_elements=["address_key"])
+    )
+    await db.commit()
+    return lat, lon
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     R = 6371
     dlat = radians(lat2 - lat1)
@@ -18,3 +75,30 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
     c = 2 * atan2(sqrt(a), sqrt(1-a))
     return R * c
+
+def haversine_distances(lat, lon, lats, lons):
+    """Distances in km from one point to each of N points, as an array of shape (N,)"""
+    R = 6371
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def haversine_matrix(lats1, lons1, lats2, lons2):
+    """Distances in km between N points and M points, as an array of shape (N, M)"""
+    R = 6371
+    lat1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, None]
+    lat2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+    lon2 = np.radians(np.asarray(lons2, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def bounding_box(lat, lon, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) of a box that contains every point within radius_km"""
+    R = 6371
+    dlat = degrees(radius_km / R)
+    # Longitude degrees shrink towards the poles; clamp so the box never inverts
+    dlon = degrees(radius_km / (R * max(cos(radians(lat)), 0.01)))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
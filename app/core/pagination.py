@@ -0,0 +1,81 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by every paginated endpoint"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned in X-Next-Cursor"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value else None), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def keyset_page(db, stmt, sort_column, id_column, page: PageParams, response=None, scalars: bool = True):
+    """
+    Return one page of the `stmt` entities ordered by (sort_column, id_column) descending.
+
+    The cursor encodes the last row of the previous page, so each page is a
+    bounded index range scan no matter how deep the client has paged.
+    When `response` is given the next cursor is also set as a header.
+    With scalars=False full rows are returned (e.g. an entity plus joined
+    columns) and the cursor is read from the leading entity.
+
+    Rows with a NULL sort value (e.g. a job never updated) come first, as a
+    backward scan of the (..., sort_column, id) indexes returns them in
+    Postgres, and the cursor predicate handles a NULL on either side.
+    """
+    if page.cursor:
+        sort_value, last_id = decode_cursor(page.cursor)
+        if sort_value is None:
+            # Still inside the NULL rows; every non-NULL row is yet to come
+            stmt = stmt.where(or_(
+                and_(sort_column.is_(None), id_column < last_id),
+                sort_column.isnot(None),
+            ))
+        else:
+            stmt = stmt.where(tuple_(sort_column, id_column) < (sort_value, last_id))
+
+    stmt = stmt.order_by(sort_column.desc().nulls_first(), id_column.desc()).limit(page.limit + 1)
+    result = await db.execute(stmt)
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1] if scalars else rows[-1][0]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    if response is not None and next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return rows, next_cursor
@@ -1,6 +1,14 @@
 """
 Price Calculation Utility for Client Backend
 """
+import logging
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+# Debug output for every quote; enable with logging.getLogger("app.core.pricing").setLevel(logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 # Base prices by SLA type
 SLA_BASE_PRICES = {
@@ -28,6 +36,274 @@ VEHICLE_SURCHARGES = {
     "7.5 tonne truck (+£500)": 500.0,
 }
 
+BASE_CALLOUT = 250.0
+MINIMUM_CHARGE = 350.0
+FURNITURE_PER_ITEM = 50
+
+# Rules shipped with the code, by category and alias. They price quotes until
+# a rule set is loaded from the database, and seed the pricing_rules table on
+# first start. Single-value categories use the alias "".
+DEFAULT_RULES = {
+    "base_callout": {"": BASE_CALLOUT},
+    "minimum_charge": {"": MINIMUM_CHARGE},
+    "furniture_per_item": {"": FURNITURE_PER_ITEM},
+    "property_size": {
+        "studio": 100, "1bed": 100, "1-bed": 100, "1": 100,
+        "2bed": 200, "2-bed": 200, "2": 200,
+        "3bed": 350, "3-bed": 350, "3": 350,
+        "4bed": 500, "4+bed": 500, "4-bed": 500, "4": 500, "5": 500,
+    },
+    # The highest number of loads also prices anything above it
+    "van_loads": {"1": 150, "2": 300, "3": 450, "4": 600},
+    # Furniture is charged per item, see furniture_per_item
+    "waste_type": {
+        "general": 0,
+        "garden": 100,
+        "gardenwaste": 100,
+        "construction": 200,
+        "hazardous": 300,
+        "hoarder": 300,
+    },
+    "access": {
+        "stairs": 100,
+        "parking": 100,
+        "long_carry": 100,
+    },
+    "urgency": {
+        "standard": 0,
+        "48h": 0,
+        "24h": 150,
+        "same_day": 300,
+    },
+    "compliance": {
+        "photo": 50,
+        "photo_report": 50,
+        "council_pack": 100,
+        "council_compliance_pack": 100,
+        "bio_clean": 250,
+        "deep_sanitation": 250,
+    },
+    "sla_base": SLA_BASE_PRICES,
+    "vehicle": VEHICLE_SURCHARGES,
+}
+
+
+def _normalise_size(value: str) -> str:
+    return value.lower().replace(" ", "").replace("-", "")
+
+def _normalise_waste(value: str) -> str:
+    return value.lower().replace(" ", "").replace("_", "")
+
+def _normalise_option(value: str) -> str:
+    return value.lower().strip().replace(" ", "_")
+
+def _normalise_urgency(value: str) -> str:
+    return value.lower().replace("-", "").replace(" ", "")
+
+# Categories looked up by a client-supplied value, and how that value is normalised
+NORMALISERS = {
+    "property_size": _normalise_size,
+    "waste_type": _normalise_waste,
+    "access": _normalise_option,
+    "urgency": _normalise_urgency,
+    "compliance": _normalise_option,
+}
+
+# Raw inputs come from a handful of form values, so each snapshot remembers
+# the price of up to this many spellings
+LOOKUP_MEMO_SIZE = 2048
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    """
+    Immutable, compiled copy of one pricing rule set.
+
+    Tables are keyed the same way inputs are normalised. A changed rule set is
+    compiled into a new snapshot and swapped in whole, so a quote never mixes
+    prices from two versions.
+    """
+    version: int
+    base_callout: float
+    minimum_charge: float
+    furniture_per_item: float
+    van_loads: Mapping[int, float]
+    tables: Mapping[str, Mapping[str, float]]
+    _memo: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def compile(cls, rules: Mapping[str, Mapping[str, float]], version: int = 0) -> "PricingSnapshot":
+        """Build a snapshot; categories missing from `rules` keep the default rules"""
+        tables = {}
+        for category, default in DEFAULT_RULES.items():
+            normalise = NORMALISERS.get(category)
+            table = {}
+            for alias, price in (rules.get(category) or default).items():
+                table.setdefault(normalise(alias) if normalise else alias, float(price))
+            tables[category] = MappingProxyType(table)
+        return cls(
+            version=version,
+            base_callout=tables["base_callout"][""],
+            minimum_charge=tables["minimum_charge"][""],
+            furniture_per_item=tables["furniture_per_item"][""],
+            van_loads=MappingProxyType({int(loads): price for loads, price in tables["van_loads"].items()}),
+            tables=MappingProxyType(tables),
+        )
+
+    @property
+    def sla_base_prices(self) -> Mapping[str, float]:
+        return self.tables["sla_base"]
+
+    @property
+    def vehicle_surcharges(self) -> Mapping[str, float]:
+        return self.tables["vehicle"]
+
+    def lookup(self, category: str, value: str) -> float:
+        """Price of a client-supplied option, 0 if it is not priced"""
+        key = (category, value)
+        price = self._memo.get(key)
+        if price is None:
+            price = self.tables[category].get(NORMALISERS[category](value), 0.0)
+            if len(self._memo) < LOOKUP_MEMO_SIZE:
+                self._memo[key] = price
+        return price
+
+    def is_furniture(self, waste_type: str) -> bool:
+        return _normalise_waste(waste_type) == "furniture"
+
+    def van_price(self, van_loads) -> float:
+        top = max(self.van_loads)
+        return self.van_loads[top] if van_loads >= top else self.van_loads.get(van_loads, 0.0)
+
+
+DEFAULT_PRICING = PricingSnapshot.compile(DEFAULT_RULES)
+
+_current_pricing = DEFAULT_PRICING
+
+
+def current_pricing() -> PricingSnapshot:
+    return _current_pricing
+
+
+def install_pricing(snapshot: PricingSnapshot):
+    """Swap in a new snapshot; quotes already running finish on the one they started with"""
+    global _current_pricing
+    _current_pricing = snapshot
+
+
+@dataclass(frozen=True)
+class PriceBreakdown:
+    """Each component of a quote; `total` is what calculate_job_price returns"""
+    base: float = BASE_CALLOUT
+    property_size: float = 0.0
+    van_loads: float = 0.0
+    waste: float = 0.0
+    access: Tuple[Tuple[str, float], ...] = field(default_factory=tuple)
+    urgency: float = 0.0
+    compliance: Tuple[Tuple[str, float], ...] = field(default_factory=tuple)
+    subtotal: float = BASE_CALLOUT
+    minimum_charge: float = MINIMUM_CHARGE
+    pricing_version: int = 0
+
+    @property
+    def total(self) -> float:
+        return max(self.subtotal, self.minimum_charge)
+
+    @property
+    def minimum_applied(self) -> bool:
+        return self.subtotal < self.minimum_charge
+
+    def as_dict(self) -> dict:
+        return {
+            "base_callout": self.base,
+            "property_size": self.property_size,
+            "van_loads": self.van_loads,
+            "waste": self.waste,
+            "access_difficulty": [{"item": item, "price": price} for item, price in self.access],
+            "urgency": self.urgency,
+            "compliance_addons": [{"item": item, "price": price} for item, price in self.compliance],
+            "subtotal": self.subtotal,
+            "minimum_charge": self.minimum_charge,
+            "minimum_applied": self.minimum_applied,
+            "total": self.total,
+            "pricing_version": self.pricing_version,
+        }
+
+
+def price_breakdown(
+    property_size: str = None,
+    van_loads: int = 1,
+    waste_type: str = "general",
+    furniture_items: int = 0,
+    access_difficulty: list = None,
+    urgency: str = "standard",
+    compliance_addons: list = None,
+    pricing: Optional[PricingSnapshot] = None
+) -> PriceBreakdown:
+    """Price a job component by component; see calculate_job_price for the rules"""
+    rules = pricing or current_pricing()
+    debug = logger.isEnabledFor(logging.DEBUG)
+    price = rules.base_callout
+
+    property_add = 0.0
+    if property_size:
+        property_add = rules.lookup("property_size", property_size)
+        if debug:
+            logger.debug("property_size: %s -> adding: %s", property_size, property_add)
+        price += property_add
+
+    van_add = rules.van_price(van_loads)
+    if debug:
+        logger.debug("van_loads: %s -> adding: %s", van_loads, van_add)
+    price += van_add
+
+    waste_add = 0.0
+    if waste_type:
+        if rules.is_furniture(waste_type):
+            waste_add = furniture_items * rules.furniture_per_item if furniture_items else 0.0
+        else:
+            waste_add = rules.lookup("waste_type", waste_type)
+        if debug:
+            logger.debug("waste_type: %s -> furniture_items: %s -> adding: %s", waste_type, furniture_items, waste_add)
+        price += waste_add
+
+    access = ()
+    if access_difficulty:
+        access = tuple((difficulty, rules.lookup("access", difficulty)) for difficulty in access_difficulty)
+        for difficulty, add_price in access:
+            if debug:
+                logger.debug("access: %s -> adding: %s", difficulty, add_price)
+            price += add_price
+
+    urgency_add = 0.0
+    if urgency:
+        urgency_add = rules.lookup("urgency", urgency)
+        price += urgency_add
+
+    compliance = ()
+    if compliance_addons:
+        compliance = tuple((addon, rules.lookup("compliance", addon)) for addon in compliance_addons)
+        for addon, add_price in compliance:
+            if debug:
+                logger.debug("compliance: %s -> adding: %s", addon, add_price)
+            price += add_price
+
+    if debug:
+        logger.debug("final price: %s (pricing v%s)", price, rules.version)
+    return PriceBreakdown(
+        base=rules.base_callout,
+        property_size=float(property_add),
+        van_loads=float(van_add),
+        waste=float(waste_add),
+        access=access,
+        urgency=float(urgency_add),
+        compliance=compliance,
+        subtotal=price,
+        minimum_charge=rules.minimum_charge,
+        pricing_version=rules.version,
+    )
+
+
 def calculate_job_price(
     property_size: str = None,
     van_loads: int = 1,
@@ -39,7 +315,8 @@ def calculate_job_price(
 ) -> float:
     """
     Calculate job price based on detailed components.
-    
+
+    Default rules; the live ones come from the active pricing rule set:
     Base: £250
     Property: studio/1bed=+£100, 2bed=+£200, 3bed=+£350, 4+bed=+£500
     Van loads: 1=+£150, 2=+£300, 3=+£450, 4+=+£600
@@ -49,90 +326,64 @@ def calculate_job_price(
     Compliance: photo=+£50, council_pack=+£100, bio_clean=+£250
     Minimum: £350
     """
-    price = 250.0  # Base call-out fee
-    print(f"PRICING DEBUG - Starting price: {price}")
-    
-    # Property size
-    property_prices = {
-        "studio": 100, "1bed": 100, "1-bed": 100, "1": 100,
-        "2bed": 200, "2-bed": 200, "2": 200,
-        "3bed": 350, "3-bed": 350, "3": 350,
-        "4bed": 500, "4+bed": 500, "4-bed": 500, "4": 500, "5": 500
-    }
-    if property_size:
-        normalized_size = property_size.lower().replace(" ", "").replace("-", "")
-        property_add = property_prices.get(normalized_size, 0)
-        print(f"PRICING DEBUG - property_size: {property_size} -> normalized: {normalized_size} -> adding: {property_add}")
-        price += property_add
-    
-    # Van loads
-    if van_loads == 1:
-        print(f"PRICING DEBUG - van_loads: 1 -> adding: 150")
-        price += 150
-    elif van_loads == 2:
-        print(f"PRICING DEBUG - van_loads: 2 -> adding: 300")
-        price += 300
-    elif van_loads == 3:
-        print(f"PRICING DEBUG - van_loads: 3 -> adding: 450")
-        price += 450
-    elif van_loads >= 4:
-        print(f"PRICING DEBUG - van_loads: {van_loads} -> adding: 600")
-        price += 600
-    
-    # Waste type
-    waste_prices = {
-        "general": 0,
-        "furniture": furniture_items * 50 if furniture_items else 0,
-        "garden": 100,
-        "gardenwaste": 100,
-        "construction": 200,
-        "hazardous": 300,
-        "hoarder": 300
-    }
-    if waste_type:
-        normalized_waste = waste_type.lower().replace(" ", "").replace("_", "")
-        waste_add = waste_prices.get(normalized_waste, 0)
-        print(f"PRICING DEBUG - waste_type: {waste_type} -> normalized: {normalized_waste} -> furniture_items: {furniture_items} -> adding: {waste_add}")
-        price += waste_add
-    
-    # Access difficulty
-    if access_difficulty:
-        access_prices = {
-            "stairs": 100,
-            "parking": 100,
-            "long_carry": 100
-        }
-        for difficulty in access_difficulty:
-            normalized = difficulty.lower().strip().replace(" ", "_")
-            add_price = access_prices.get(normalized, 0)
-            print(f"PRICING DEBUG - access: {difficulty} -> normalized: {normalized} -> adding: {add_price}")
-            price += add_price
-    
-    # Urgency
-    urgency_prices = {
-        "standard": 0,
-        "48h": 0,
-        "24h": 150,
-        "same_day": 300
-    }
-    if urgency:
-        price += urgency_prices.get(urgency.lower().replace("-", "").replace(" ", ""), 0)
-    
-    # Compliance add-ons
-    if compliance_addons:
-        compliance_prices = {
-            "photo": 50,
-            "photo_report": 50,
-            "council_pack": 100,
-            "council_compliance_pack": 100,
-            "bio_clean": 250,
-            "deep_sanitation": 250
-        }
-        for addon in compliance_addons:
-            normalized = addon.lower().strip().replace(" ", "_")
-            add_price = compliance_prices.get(normalized, 0)
-            print(f"PRICING DEBUG - compliance: {addon} -> normalized: {normalized} -> adding: {add_price}")
-            price += add_price
-    
-    print(f"PRICING DEBUG - Final price: {price}")
-    return max(price, 350.0)
+    return price_breakdown(
+        property_size, van_loads, waste_type, furniture_items,
+        access_difficulty, urgency, compliance_addons
+    ).total
+
+
+def _column_prices(values: Sequence, price_of: Callable) -> np.ndarray:
+    """Price per row of a categorical column, pricing each distinct value only once"""
+    codes = {}
+    index = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.intp, count=len(values))
+    table = np.fromiter((price_of(value) if value else 0 for value in codes), dtype=np.float64, count=len(codes))
+    return table[index]
+
+
+def _list_column_prices(rows: Sequence, price_of: Callable) -> np.ndarray:
+    """Summed price per row of a column holding a list of options"""
+    owners = [row for row, items in enumerate(rows) if items for _ in items]
+    items = [item for items in rows if items for item in items]
+    if not items:
+        return np.zeros(len(rows))
+    return np.bincount(owners, weights=_column_prices(items, price_of), minlength=len(rows))
+
+
+def calculate_job_prices(jobs: Iterable[dict], pricing: Optional[PricingSnapshot] = None) -> List[float]:
+    """
+    Price many jobs in one pass; each job is a dict of calculate_job_price
+    keyword arguments. Prices are identical to calling calculate_job_price
+    on each job.
+    """
+    rules = pricing or current_pricing()
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    def column(name, default=None):
+        return [job.get(name, default) for job in jobs]
+
+    def priced(category):
+        return lambda value: rules.lookup(category, value)
+
+    van_loads = np.asarray(column("van_loads", 1), dtype=np.float64)
+    waste_types = column("waste_type", "general")
+    furniture = np.asarray([items or 0 for items in column("furniture_items", 0)], dtype=np.float64)
+    is_furniture = _column_prices(waste_types, rules.is_furniture).astype(bool)
+
+    # Highest load count first, so it also catches anything above it
+    loads = sorted(rules.van_loads, reverse=True)
+    price = np.full(len(jobs), rules.base_callout)
+    price += _column_prices(column("property_size"), priced("property_size"))
+    price += np.select(
+        [van_loads >= loads[0]] + [van_loads == count for count in loads[1:]],
+        [rules.van_loads[count] for count in loads],
+        0
+    )
+    price += np.where(
+        is_furniture, furniture * rules.furniture_per_item, _column_prices(waste_types, priced("waste_type"))
+    )
+    price += _list_column_prices(column("access_difficulty"), priced("access"))
+    price += _column_prices(column("urgency", "standard"), priced("urgency"))
+    price += _list_column_prices(column("compliance_addons"), priced("compliance"))
+    return np.maximum(price, rules.minimum_charge).tolist()
@@ -0,0 +1,226 @@
+"""
+Pricing rules stored in versioned tables, compiled into in-memory snapshots.
+
+Quotes are priced from app.core.pricing.current_pricing() and never read these
+tables. A watcher in every worker loads the active rule set at startup and swaps
+in a new snapshot when one is published, either on a Postgres NOTIFY or, if
+that is missed, on the next poll.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Optional
+
+from sqlalchemy import func, select, text, update
+
+from app.core.pricing import DEFAULT_RULES, PricingSnapshot, current_pricing, install_pricing
+from app.database.db import AsyncSessionLocal, async_engine
+from app.models.pricing_rule import PricingRule, PricingRuleSet
+
+PRICING_CHANNEL = os.getenv("PRICING_CHANNEL", "pricing_rules")
+# Fallback for a missed notification or a dropped listener connection
+PRICING_POLL_INTERVAL = float(os.getenv("PRICING_POLL_INTERVAL", "60"))
+
+
+def _active_rule_set_query():
+    return (
+        select(PricingRuleSet)
+        .where(PricingRuleSet.is_active.is_(True))
+        .order_by(PricingRuleSet.version.desc())
+        .limit(1)
+    )
+
+
+def _compile(rule_set: PricingRuleSet, rules) -> PricingSnapshot:
+    tables: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for rule in rules:
+        tables[rule.category][rule.key] = float(rule.amount)
+    return PricingSnapshot.compile(tables, version=rule_set.version)
+
+
+async def active_pricing_version(db) -> Optional[int]:
+    result = await db.execute(
+        select(func.max(PricingRuleSet.version)).where(PricingRuleSet.is_active.is_(True))
+    )
+    return result.scalar()
+
+
+async def load_active_pricing(db) -> Optional[PricingSnapshot]:
+    """Compile the active rule set, or None if none has been published"""
+    result = await db.execute(_active_rule_set_query())
+    rule_set = result.scalar_one_or_none()
+    if not rule_set:
+        return None
+    result = await db.execute(select(PricingRule).where(PricingRule.rule_set_id == rule_set.id))
+    return _compile(rule_set, result.scalars().all())
+
+
+def _rule_rows(rules: Mapping[str, Mapping[str, float]]):
+    return [
+        PricingRule(category=category, key=key, amount=amount)
+        for category, prices in rules.items()
+        for key, amount in prices.items()
+    ]
+
+
+async def publish_rule_set(db, rules: Mapping[str, Mapping[str, float]], notes: str = None) -> PricingSnapshot:
+    """
+    Store `rules` as a new version and make it the active one.
+
+    Categories left out of `rules` keep their default prices. Workers are
+    notified in the same transaction, so they only hear about committed rules.
+    """
+    # Reject rules that do not compile before anything is stored
+    PricingSnapshot.compile(rules)
+    latest = (await db.execute(select(func.max(PricingRuleSet.version)))).scalar() or 0
+    now = datetime.now(timezone.utc)
+
+    await db.execute(
+        update(PricingRuleSet).where(PricingRuleSet.is_active.is_(True)).values(is_active=False)
+    )
+    rule_set = PricingRuleSet(version=latest + 1, is_active=True, notes=notes, activated_at=now)
+    rule_set_rules = _rule_rows(rules)
+    db.add(rule_set)
+    await db.flush()
+    for rule in rule_set_rules:
+        rule.rule_set_id = rule_set.id
+    db.add_all(rule_set_rules)
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": PRICING_CHANNEL, "payload": str(rule_set.version)}
+        )
+    await db.commit()
+
+    snapshot = PricingSnapshot.compile(rules, version=rule_set.version)
+    install_pricing(snapshot)
+    print(f"✅ Pricing rules v{rule_set.version} published")
+    return snapshot
+
+
+def seed_default_pricing(db):
+    """Store the built-in rules as version 1 if no rule set exists yet"""
+    if db.query(PricingRuleSet).count() > 0:
+        return False
+    rule_set = PricingRuleSet(
+        version=1, is_active=True, notes="Default rules", activated_at=datetime.now(timezone.utc)
+    )
+    db.add(rule_set)
+    db.flush()
+    rules = _rule_rows(DEFAULT_RULES)
+    for rule in rules:
+        rule.rule_set_id = rule_set.id
+    db.add_all(rules)
+    db.commit()
+    return True
+
+
+class PricingRulesWatcher:
+    """
+    Keeps this worker's pricing snapshot on the active rule set.
+
+    On Postgres a dedicated connection LISTENs for new versions; polling the
+    active version every PRICING_POLL_INTERVAL seconds covers everything else.
+    A refresh compiles the new snapshot off to the side and installs it with a
+    single assignment.
+    """
+
+    def __init__(self, poll_interval: float = PRICING_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._listener = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"⚠️ Pricing rules not loaded, using version {current_pricing().version}: {e}")
+        await self._listen()
+        self._task = asyncio.create_task(self._poller())
+        print(f"✅ Pricing rules watcher started (version {current_pricing().version})")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self._unlisten()
+        print("✅ Pricing rules watcher stopped")
+
+    async def refresh(self, version: Optional[int] = None) -> bool:
+        """Install the active rule set if it is newer than ours. Returns True if it was swapped."""
+        if version is not None and version <= current_pricing().version:
+            return False
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                latest = await active_pricing_version(db)
+                if latest is None or latest == current_pricing().version:
+                    return False
+                snapshot = await load_active_pricing(db)
+            if not snapshot:
+                return False
+            install_pricing(snapshot)
+            print(f"✅ Pricing rules v{snapshot.version} installed")
+            return True
+
+    async def _poller(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if self._listener is None or self._listener[1].is_closed():
+                    await self._unlisten()
+                    await self._listen()
+                await self.refresh()
+            except Exception as e:
+                print(f"❌ Pricing rules refresh failed: {e}")
+
+    async def _listen(self):
+        if async_engine.dialect.name != "postgresql":
+            return
+        loop = asyncio.get_running_loop()
+
+        def notified(connection, pid, channel, payload):
+            try:
+                version = int(payload)
+            except (TypeError, ValueError):
+                version = None
+            loop.create_task(self._refresh_quietly(version))
+
+        try:
+            conn = await async_engine.connect()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.add_listener(PRICING_CHANNEL, notified)
+            self._listener = (conn, raw.driver_connection, notified)
+        except Exception as e:
+            print(f"⚠️ Pricing rules listener unavailable, polling every {self.poll_interval:.0f}s: {e}")
+            self._listener = None
+
+    async def _unlisten(self):
+        if self._listener is None:
+            return
+        conn, driver_connection, notified = self._listener
+        self._listener = None
+        try:
+            await driver_connection.remove_listener(PRICING_CHANNEL, notified)
+            await conn.close()
+        except Exception:
+            pass
+
+    async def _refresh_quietly(self, version: Optional[int]):
+        try:
+            await self.refresh(version)
+        except Exception as e:
+            print(f"❌ Pricing rules refresh failed: {e}")
+
+
+# Singleton instance
+pricing_rules_watcher = PricingRulesWatcher()
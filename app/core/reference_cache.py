@@ -0,0 +1,141 @@
+"""
+In-process cache for reference data (service types, urgency levels, waste types, access difficulties)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models.service_type import ServiceType
+from app.models.urgency_level import UrgencyLevel
+from app.models.waste_type import WasteType
+from app.models.access_difficulty import AccessDifficulty
+
+# Reference tables change a few times a year, so a snapshot is trusted for this long
+# before it is reloaded even if nobody invalidated it
+REFERENCE_CACHE_TTL = int(os.getenv("REFERENCE_CACHE_TTL", "300"))
+
+REFERENCE_MODELS = {
+    "service_types": ServiceType,
+    "urgency_levels": UrgencyLevel,
+    "waste_types": WasteType,
+    "access_difficulties": AccessDifficulty,
+}
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Immutable copy of one reference table"""
+    name: str
+    version: int
+    etag: str
+    loaded_at: float
+    rows: Tuple[dict, ...]
+    by_id: Dict[str, dict]
+
+    @property
+    def active(self) -> list:
+        return [row for row in self.rows if row.get("is_active")]
+
+    @property
+    def headers(self) -> dict:
+        return {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={REFERENCE_CACHE_TTL}",
+        }
+
+    def get(self, row_id) -> Optional[dict]:
+        if row_id is None:
+            return None
+        return self.by_id.get(str(row_id))
+
+    def name_of(self, row_id, default: str = "Unknown") -> str:
+        row = self.get(row_id)
+        return row["name"] if row else default
+
+
+class ReferenceCache:
+    """
+    Versioned snapshots of the reference tables.
+
+    Each table is loaded once and served from memory until it is invalidated
+    explicitly or its TTL runs out. Every reload bumps the version; the ETag is
+    derived from the content so all workers agree on it.
+    """
+
+    def __init__(self, ttl: int = REFERENCE_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshots: Dict[str, ReferenceSnapshot] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, db, name: str) -> ReferenceSnapshot:
+        snapshot = self._fresh(name)
+        if snapshot:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._fresh(name)
+            if snapshot:
+                return snapshot
+            model = REFERENCE_MODELS[name]
+            return self._store(name, db.query(model).order_by(model.id).all())
+
+    async def get_async(self, db, name: str) -> ReferenceSnapshot:
+        snapshot = self._fresh(name)
+        if snapshot:
+            return snapshot
+
+        model = REFERENCE_MODELS[name]
+        result = await db.execute(select(model).order_by(model.id))
+        objects = result.scalars().all()
+        with self._lock:
+            return self._fresh(name) or self._store(name, objects)
+
+    def invalidate(self, name: str = None):
+        with self._lock:
+            if name:
+                self._snapshots.pop(name, None)
+            else:
+                self._snapshots.clear()
+
+    def _fresh(self, name: str) -> Optional[ReferenceSnapshot]:
+        snapshot = self._snapshots.get(name)
+        if snapshot and time.monotonic() - snapshot.loaded_at < self.ttl:
+            return snapshot
+        return None
+
+    def _store(self, name: str, objects) -> ReferenceSnapshot:
+        rows = tuple(
+            {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+            for obj in objects
+        )
+        digest = hashlib.sha1(json.dumps(rows, default=str, sort_keys=True).encode()).hexdigest()
+        self._version += 1
+        snapshot = ReferenceSnapshot(
+            name=name,
+            version=self._version,
+            etag=f'"{name}-{digest[:16]}"',
+            loaded_at=time.monotonic(),
+            rows=rows,
+            by_id={str(row["id"]): row for row in rows},
+        )
+        self._snapshots[name] = snapshot
+        return snapshot
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+# Singleton instance
+reference_cache = ReferenceCache()
@@ -1,24 +1,181 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
+from typing import Optional, Tuple
+from jose import jwt as jose_jwt, JWTError
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.cache import LRUCache
+
 SECRET_KEY = "your-secret-key-change-in-production"
 REFRESH_SECRET_KEY = "your-refresh-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+# "jose" (python-jose) or "pyjwt" (optional). bench_auth.py measures jose as the
+# faster of the two here; pyjwt is for deployments that standardise on it
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose").lower()
+# Verified access tokens remembered per process; each entry expires with its token
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# bcrypt work factor; stored hashes with a different cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so this many hashes run in parallel off the event loop
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+# Hashes allowed to wait for a worker; beyond that requests get a 503
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "64"))
+
+try:
+    import jwt as pyjwt
+    PYJWT_AVAILABLE = True
+except ImportError:
+    PYJWT_AVAILABLE = False
+    if JWT_BACKEND == "pyjwt":
+        print("PyJWT not installed. Falling back to python-jose. Install with: pip install pyjwt")
+
+
+class JoseBackend:
+    name = "jose"
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        return jose_jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithms: list) -> dict:
+        return jose_jwt.decode(token, key, algorithms=algorithms)
+
+
+class PyJWTBackend:
+    """PyJWT, with its errors raised as JWTError so callers need not care which backend is in use"""
+    name = "pyjwt"
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        return pyjwt.encode(claims, key, algorithm=algorithm)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def decode(self, token: str, key: str, algorithms: list) -> dict:
+        try:
+            return pyjwt.decode(token, key, algorithms=algorithms)
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+
+
+def _get_backend():
+    if JWT_BACKEND == "pyjwt" and PYJWT_AVAILABLE:
+        return PyJWTBackend()
+    return JoseBackend()
+
+
+# Singleton instance
+jwt = _get_backend()
+token_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 security = HTTPBearer()
 
+
+class PasswordHasher:
+    """
+    Bounded thread pool for bcrypt, so a login never blocks the event loop.
+
+    At most `workers` hashes run at once and `max_pending` more may wait;
+    further requests are refused with a 503 rather than queueing for seconds.
+    stats() reports queue depth and timings.
+    """
+
+    def __init__(self, workers: int = BCRYPT_WORKERS, max_pending: int = BCRYPT_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.queued >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_seconds += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.hash_seconds += time.perf_counter() - started
+
+        def done(future):
+            # Cancelled before a worker picked it up, so call() never ran
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+
+        future = self._get_executor().submit(call)
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "rounds": BCRYPT_ROUNDS,
+                "queued": self.queued,
+                "running": self.running,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_seconds / completed * 1000, 1),
+                "avg_hash_ms": round(self.hash_seconds / completed * 1000, 1),
+            }
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Singleton instance
+password_hasher = PasswordHasher()
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash if the stored one uses an outdated cost"""
+    return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -40,18 +197,35 @@ def verify_refresh_token(token: str):
     except:
         return None
 
+def decode_access_token(token: str) -> dict:
+    """
+    Claims of a valid access token, verified once per process.
+
+    Verified claims are cached under the token's SHA-256 digest until the
+    token's own `exp`, so the signature is not checked again on every request.
+    Raises JWTError for an invalid or expired token.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload.get("type") == "access" and isinstance(payload.get("exp"), (int, float)):
+            token_cache.set(key, payload, expires_at=payload["exp"])
+    # Callers get their own copy, the cached claims must not change
+    return dict(payload)
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(credentials.credentials)
         if payload.get("type") != "access":
             raise HTTPException(status_code=401, detail="Invalid token type")
         return payload
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def verify_token(token: str):
+def verify_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         if payload.get("type") != "access":
             return None
         return payload
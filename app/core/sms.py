@@ -1,4 +1,6 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,31 +8,103 @@ load_dotenv()
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+# "twilio" sends real messages; "fake" only records and prints them (local development)
+SMS_BACKEND = os.getenv("SMS_BACKEND", "twilio").lower()
+SMS_WORKERS = int(os.getenv("SMS_WORKERS", "4"))
 
 try:
     from twilio.rest import Client
     TWILIO_AVAILABLE = True
 except ImportError:
     TWILIO_AVAILABLE = False
-    print("Twilio not installed. SMS OTP will be disabled. Install with: pip install twilio")
+    if SMS_BACKEND == "twilio":
+        print("Twilio not installed. SMS OTP will be disabled. Install with: pip install twilio")
+
+
+class TwilioTransport:
+    """One Twilio client for the whole process, so its HTTP session and connections are reused"""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return TWILIO_AVAILABLE and bool(TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN)
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        return self._client
+
+    def send(self, to: str, body: str):
+        self._get_client().messages.create(body=body, from_=TWILIO_PHONE_NUMBER, to=to)
+
+
+class FakeTransport:
+    """Keeps sent messages in memory instead of sending them"""
+
+    available = True
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, to: str, body: str):
+        self.sent.append((to, body))
+        print(f"[fake sms] to {to}: {body}")
+
+
+class SMSSender:
+    """
+    Sends SMS on a small thread pool so OTP endpoints do not wait on the provider.
+    """
+
+    def __init__(self, transport=None, workers: int = SMS_WORKERS):
+        self.transport = transport or (FakeTransport() if SMS_BACKEND == "fake" else TwilioTransport())
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sms")
+        return self._executor
+
+    def send(self, to: str, body: str):
+        """Queue a message; returns a Future that resolves to True once it is sent"""
+        return self._get_executor().submit(self._send, to, body)
+
+    def _send(self, to: str, body: str) -> bool:
+        try:
+            self.transport.send(to, body)
+            return True
+        except Exception as e:
+            print(f"Failed to send SMS: {e}")
+            return False
+
+    def stop(self):
+        """Wait for queued messages to go out"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
 
 def send_otp_sms(phone_number: str, otp: str):
-    if not TWILIO_AVAILABLE:
-        print(f"SMS OTP requested but Twilio not installed. OTP: {otp}")
-        return False
-    
-    if not TWILIO_ACCOUNT_SID or not TWILIO_AUTH_TOKEN:
-        print(f"Twilio not configured. OTP: {otp}")
-        return False
-    
-    try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        message = client.messages.create(
-            body=f"Your OTP code is: {otp}. Valid for 10 minutes.",
-            from_=TWILIO_PHONE_NUMBER,
-            to=phone_number
-        )
-        return True
-    except Exception as e:
-        print(f"Failed to send SMS: {e}")
+    if not sms_sender.transport.available:
+        if not TWILIO_AVAILABLE:
+            print(f"SMS OTP requested but Twilio not installed. OTP: {otp}")
+        else:
+            print(f"Twilio not configured. OTP: {otp}")
         return False
+
+    sms_sender.send(phone_number, f"Your OTP code is: {otp}. Valid for 10 minutes.")
+    return True
+
+
+# Singleton instance
+sms_sender = SMSSender()
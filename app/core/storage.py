@@ -3,7 +3,10 @@ from botocore.client import Config
 from botocore.exceptions import ClientError
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import asyncio
+import threading
 import uuid
 
 load_dotenv()
@@ -15,6 +18,10 @@ class UthoStorage:
         self.bucket_name = os.getenv("UTHO_BUCKET_NAME")
         self.endpoint_url = os.getenv("UTHO_ENDPOINT_URL")
         self.region = os.getenv("UTHO_REGION", "in-noida-1")
+        # Concurrent uploads per process; the S3 connection pool is sized to match
+        self.upload_workers = int(os.getenv("STORAGE_UPLOAD_WORKERS", "8"))
+        self._executor = None
+        self._executor_lock = threading.Lock()
         
         self.s3_client = boto3.client(
             's3',
@@ -22,9 +29,16 @@ class UthoStorage:
             aws_secret_access_key=self.secret_key,
             endpoint_url=self.endpoint_url,
             region_name=self.region,
-            config=Config(signature_version='s3v4')
+            config=Config(signature_version='s3v4', max_pool_connections=max(10, self.upload_workers))
         )
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="storage")
+        return self._executor
+    
     def upload_file(self, file_data, folder: str, filename: str) -> Optional[str]:
         """
         Upload file to Utho object storage
@@ -54,6 +68,26 @@ class UthoStorage:
             print(f"Error uploading file: {e}")
             return None
     
+    def upload_many(self, uploads) -> List[Optional[str]]:
+        """
+        Upload several files concurrently
+        
+        Args:
+            uploads: (file_data, folder, filename) tuples
+            
+        Returns:
+            Public URL per file in the given order, None where the upload failed
+        """
+        futures = [self._get_executor().submit(self.upload_file, *upload) for upload in uploads]
+        urls = []
+        for upload, future in zip(uploads, futures):
+            try:
+                urls.append(future.result())
+            except Exception as e:
+                print(f"Error uploading {upload[2]}: {e}")
+                urls.append(None)
+        return urls
+    
     def upload_crew_document(self, file_data, crew_id: str, doc_type: str, filename: str) -> Optional[str]:
         """
         Upload crew registration documents
@@ -105,6 +139,35 @@ class UthoStorage:
         unique_filename = f"property_{uuid.uuid4().hex[:8]}_{filename}"
         return self.upload_file(file_data, folder, unique_filename)
     
+    async def upload_client_job_photos(self, photos, client_id: str, job_id: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Upload several client job property photos concurrently
+        
+        Args:
+            photos: (file_data, filename) pairs
+            client_id: Client ID
+            job_id: Job ID
+            
+        Returns:
+            (filename, public URL) per photo in the given order; the URL is None if that upload failed
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, self.upload_client_job_photo, file_data, client_id, job_id, filename)
+                for file_data, filename in photos
+            ),
+            return_exceptions=True
+        )
+        uploaded = []
+        for (_, filename), result in zip(photos, results):
+            if isinstance(result, Exception):
+                print(f"Error uploading {filename}: {result}")
+                result = None
+            uploaded.append((filename, result))
+        return uploaded
+    
     def upload_crew_profile_photo(self, file_data, crew_id: str, filename: str) -> Optional[str]:
         """
         Upload crew profile photo
@@ -139,6 +202,12 @@ class UthoStorage:
             print(f"Error deleting file: {e}")
             return False
     
+    def object_key(self, file_url: str) -> str:
+        """Object key for a full file URL (keys are returned unchanged)"""
+        if self.bucket_name in file_url:
+            return file_url.split(f"{self.bucket_name}/")[1]
+        return file_url
+    
     def download_file(self, file_url: str) -> Optional[bytes]:
         """
         Download file from storage
@@ -150,17 +219,45 @@ class UthoStorage:
             File content as bytes or None if failed
         """
         try:
-            # Extract object key from URL
-            if self.bucket_name in file_url:
-                object_key = file_url.split(f"{self.bucket_name}/")[1]
-            else:
-                object_key = file_url
-            
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_key)
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.object_key(file_url))
             return response['Body'].read()
         except Exception as e:
             print(f"Error downloading file: {e}")
             return None
+    
+    def open_file(self, file_url: str, byte_range: Optional[str] = None, if_none_match: Optional[str] = None) -> dict:
+        """
+        Open a file for streaming without reading it
+        
+        Args:
+            file_url: Full URL of the file or object key
+            byte_range: HTTP Range header value, passed through to storage
+            if_none_match: HTTP If-None-Match header value, passed through to storage
+            
+        Returns:
+            The get_object response; 'Body' is read in chunks by the caller and must be closed.
+            A 304 or 416 from storage is raised as ClientError.
+        """
+        params = {"Bucket": self.bucket_name, "Key": self.object_key(file_url)}
+        if byte_range:
+            params["Range"] = byte_range
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+        return self.s3_client.get_object(**params)
+    
+    def presigned_download_url(self, file_url: str, filename: str, expires_in: int = 60) -> str:
+        """
+        Short-lived URL that downloads the file straight from storage
+        """
+        return self.s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": self.object_key(file_url),
+                "ResponseContentDisposition": f"attachment; filename={filename}",
+            },
+            ExpiresIn=expires_in
+        )
 
 # Singleton instance
 storage = UthoStorage()
@@ -6,5 +6,7 @@ from app.models.waste_type import WasteType
 from app.models.access_difficulty import AccessDifficulty
 from app.models.job import Job
 from app.models.invoice import Invoice
+from app.models.geocode_cache import GeocodeCache
+from app.models.pricing_rule import PricingRuleSet, PricingRule
 
-__all__ = ["Client", "UrgencyLevel", "ServiceType", "WasteType", "AccessDifficulty", "Job", "Invoice"]
+__all__ = ["Client", "UrgencyLevel", "ServiceType", "WasteType", "AccessDifficulty", "Job", "Invoice", "GeocodeCache", "PricingRuleSet", "PricingRule"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Boolean, case, or_, select
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -17,7 +17,7 @@ class Client(Base):
     company_name = Column(String)
     contact_person_name = Column(String)
     department = Column(String)
-    phone_number = Column(String)
+    phone_number = Column(String, index=True)
     client_type = Column(String)
     business_address = Column(String)
     is_verified = Column(Boolean, default=False)
@@ -34,11 +34,28 @@ class Client(Base):
     invoices = relationship("Invoice", back_populates="client")
 
     @staticmethod
-    def get_by_email(db, email: str):
-        return db.query(Client).filter(Client.email == email).first()
+    async def get_by_email(db, email: str):
+        result = await db.execute(select(Client).where(Client.email == email))
+        return result.scalars().first()
     
     @staticmethod
-    def create(db, email: str, password: str, full_name: str = None, company_name: str = None, contact_person_name: str = None, department: str = None, phone_number: str = None, client_type: str = None, business_address: str = None, otp_method: str = "email"):
+    async def get_by_phone(db, phone_number: str):
+        result = await db.execute(select(Client).where(Client.phone_number == phone_number))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_by_identifier(db, identifier: str):
+        """Client whose email or phone number is `identifier`, preferring an email match"""
+        result = await db.execute(
+            select(Client)
+            .where(or_(Client.email == identifier, Client.phone_number == identifier))
+            .order_by(case((Client.email == identifier, 0), else_=1))
+            .limit(1)
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def create(db, email: str, password: str, full_name: str = None, company_name: str = None, contact_person_name: str = None, department: str = None, phone_number: str = None, client_type: str = None, business_address: str = None, otp_method: str = "email"):
         otp = str(random.randint(1000, 9999))
         otp_expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=10)
         
@@ -60,49 +77,41 @@ class Client(Base):
         
         try:
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             return user.id, otp, otp_method
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error creating client: {e}")
             return None, None, None
     
     @staticmethod
-    def verify_otp(db, identifier: str, otp: str):
-        # Try email first
-        user = db.query(Client).filter(Client.email == identifier).first()
+    async def verify_otp(db, identifier: str, otp: str):
+        """Mark the client verified if the OTP matches; returns the client, or None"""
+        user = await Client.get_by_identifier(db, identifier)
         
-        # If not found, try phone
         if not user:
-            user = db.query(Client).filter(Client.phone_number == identifier).first()
-        
-        if not user:
-            return False
+            return None
         
         if user.otp == otp and datetime.now(timezone.utc).replace(tzinfo=None) < user.otp_expiry:
             user.is_verified = True
             user.otp = None
             user.otp_expiry = None
-            db.commit()
-            return True
+            await db.commit()
+            return user
         
-        return False
+        return None
     
     @staticmethod
-    def resend_otp(db, identifier: str, otp_method: str = "email"):
-        # Try email first
-        user = db.query(Client).filter(Client.email == identifier).first()
-        
-        # If not found, try phone
-        if not user:
-            user = db.query(Client).filter(Client.phone_number == identifier).first()
+    async def resend_otp(db, identifier: str, otp_method: str = "email"):
+        """Issue a new OTP; returns (otp, otp_method, client), or Nones if there is nothing to verify"""
+        user = await Client.get_by_identifier(db, identifier)
         
         if not user:
-            return None, None
+            return None, None, None
         
         if user.is_verified:
-            return None, None
+            return None, None, None
         
         otp = str(random.randint(1000, 9999))
         otp_expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=10)
@@ -110,6 +119,6 @@ class Client(Base):
         user.otp = otp
         user.otp_expiry = otp_expiry
         user.otp_method = otp_method
-        db.commit()
+        await db.commit()
         
-        return otp, otp_method
+        return otp, otp_method, user
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Float, DateTime
+from datetime import datetime, timezone
+from app.database.db import Base
+
+class GeocodeCache(Base):
+    __tablename__ = "geocode_cache"
+    
+    address_key = Column(String(255), primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Boolean, Index
 from datetime import datetime, timezone
 from app.database.db import Base
 import uuid
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Client job lists ordered by creation (jobs, tracking, history, quotes)
+        Index("ix_jobs_client_id_created_at", "client_id", "created_at", "id"),
+        # Client job lists filtered by status and ordered by last update (completed jobs, payment requests)
+        Index("ix_jobs_client_id_status_updated_at", "client_id", "status", "updated_at", "id"),
+        # Unassigned drafts and status sweeps
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+        # Crew rating and crew job lookups
+        Index("ix_jobs_assigned_crew_id", "assigned_crew_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     client_id = Column(String, nullable=True)
@@ -29,5 +39,8 @@ class Job(Base):
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     rating = Column(Float, nullable=True)
+    # Re-dispatch bookkeeping for the crew dispatcher's sweep
+    dispatch_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_dispatch_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, String, Float, DateTime, Boolean
+from sqlalchemy import Column, String, Float, DateTime, Boolean, Index
 from datetime import datetime
 from app.database.db import Base
 import uuid
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_job_id_type_status", "job_id", "payment_type", "payment_status"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     job_id = Column(String, nullable=False)
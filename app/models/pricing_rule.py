@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Numeric, ForeignKey, UniqueConstraint
+from datetime import datetime, timezone
+from app.database.db import Base
+
+class PricingRuleSet(Base):
+    """One published version of the pricing rules; only the newest active set is used"""
+    __tablename__ = "pricing_rule_sets"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    version = Column(Integer, unique=True, nullable=False)
+    is_active = Column(Boolean, default=False, nullable=False)
+    notes = Column(String(255))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    activated_at = Column(DateTime)
+
+class PricingRule(Base):
+    """Price of one option (`key`) within a category, e.g. ("urgency", "24h") = 150"""
+    __tablename__ = "pricing_rules"
+    __table_args__ = (
+        UniqueConstraint("rule_set_id", "category", "key", name="uq_pricing_rules_set_category_key"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    rule_set_id = Column(Integer, ForeignKey("pricing_rule_sets.id", ondelete="CASCADE"), nullable=False, index=True)
+    category = Column(String(50), nullable=False)
+    key = Column(String(100), nullable=False, default="")
+    amount = Column(Numeric(10, 2), nullable=False)
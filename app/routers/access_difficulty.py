@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.database.db import get_db
-from app.models.access_difficulty import AccessDifficulty
+from app.core.reference_cache import reference_cache, etag_matches
 
 router = APIRouter()
 
 @router.get("/access-difficulties", tags=["Access Difficulty"])
-def get_access_difficulties(db: Session = Depends(get_db)):
-    access_difficulties = db.query(AccessDifficulty).filter(AccessDifficulty.is_active == True).all()
-    return access_difficulties
+def get_access_difficulties(request: Request, response: Response, db: Session = Depends(get_db)):
+    snapshot = reference_cache.get(db, "access_difficulties")
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=snapshot.headers)
+    response.headers.update(snapshot.headers)
+    return snapshot.active
 
 @router.get("/access-difficulties/{access_difficulty_id}", tags=["Access Difficulty"])
 def get_access_difficulty_by_id(access_difficulty_id: int, db: Session = Depends(get_db)):
-    access_difficulty = db.query(AccessDifficulty).filter(AccessDifficulty.id == access_difficulty_id).first()
+    access_difficulty = reference_cache.get(db, "access_difficulties").get(access_difficulty_id)
     if not access_difficulty:
         raise HTTPException(status_code=404, detail="Access difficulty not found")
     return access_difficulty
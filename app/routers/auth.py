@@ -1,32 +1,34 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.auth import ClientRegister, Login, Token, MessageResponse, RefreshTokenRequest, VerifyOTP, UpdateClientProfile, ResendOTP, ForgotPassword, VerifyForgotOTP, ResetPassword
 from app.models.client import Client
-from app.database.db import get_db
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, verify_refresh_token, get_current_user
+from app.database.db import get_async_db
+from app.core.security import hash_password_async, verify_and_update_password, create_access_token, create_refresh_token, verify_refresh_token, get_current_user
+from app.core.client_cache import ClientSnapshot, client_cache, get_current_client
 from app.core.email import send_otp_email
 from app.core.sms import send_otp_sms
 from app.core.storage import storage
+import asyncio
 import os
 
 router = APIRouter()
 
 @router.post("/register/client", response_model=MessageResponse, tags=["Authentication"])
-async def register_client(client: ClientRegister, db: Session = Depends(get_db)):
+async def register_client(client: ClientRegister, db: AsyncSession = Depends(get_async_db)):
     try:
         print(f"Registration attempt for: {client.email}")
         
-        existing_client = Client.get_by_email(db, client.email)
+        existing_client = await Client.get_by_email(db, client.email)
         if existing_client:
             print(f"Email already exists: {client.email}")
             raise HTTPException(status_code=400, detail="Email already registered")
         
         print(f"Creating client record...")
-        result = Client.create(
+        result = await Client.create(
             db=db,
             email=client.email,
-            password=hash_password(client.password),
+            password=await hash_password_async(client.password),
             full_name=client.full_name,
             company_name=client.company_name,
             phone_number=client.phone_number,
@@ -54,6 +56,10 @@ async def register_client(client: ClientRegister, db: Session = Depends(get_db))
                 print(f"Sending OTP via SMS to {client.phone_number}")
                 send_otp_sms(client.phone_number, otp)
                 return {"message": "Registration successful. OTP sent to your phone."}
+        except asyncio.QueueFull:
+            # The mail queue is full; never fall back to showing the OTP
+            print(f"Warning: Mail queue full, OTP for {client.email} not sent")
+            raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
         except Exception as email_error:
             print(f"Warning: Failed to send OTP: {email_error}")
             import traceback
@@ -70,16 +76,11 @@ async def register_client(client: ClientRegister, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
 @router.post("/verify-otp", response_model=Token, summary="Verify Registration OTP", tags=["Authentication"])
-async def verify_otp(data: VerifyOTP, db: Session = Depends(get_db)):
-    if not Client.verify_otp(db, data.identifier, data.otp):
-        raise HTTPException(status_code=400, detail="Invalid or expired OTP")
-    
-    # Try email first
-    user = Client.get_by_email(db, data.identifier)
-    
-    # If not found, try phone
+async def verify_otp(data: VerifyOTP, db: AsyncSession = Depends(get_async_db)):
+    user = await Client.verify_otp(db, data.identifier, data.otp)
     if not user:
-        user = db.query(Client).filter(Client.phone_number == data.identifier).first()
+        raise HTTPException(status_code=400, detail="Invalid or expired OTP")
+    client_cache.invalidate(user.id)
     
     access_token = create_access_token(
         data={"sub": str(user.id), "role": "client"}
@@ -91,24 +92,13 @@ async def verify_otp(data: VerifyOTP, db: Session = Depends(get_db)):
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post("/resend-otp", response_model=MessageResponse, tags=["Authentication"])
-async def resend_otp(data: ResendOTP, db: Session = Depends(get_db)):
+async def resend_otp(data: ResendOTP, db: AsyncSession = Depends(get_async_db)):
     try:
-        result = Client.resend_otp(db, data.identifier, data.otp_method)
-        otp, otp_method = result
+        otp, otp_method, user = await Client.resend_otp(db, data.identifier, data.otp_method)
         
         if not otp:
             raise HTTPException(status_code=400, detail="User not found or already verified")
         
-        # Try email first
-        user = Client.get_by_email(db, data.identifier)
-        
-        # If not found, try phone
-        if not user:
-            user = db.query(Client).filter(Client.phone_number == data.identifier).first()
-        
-        if not user:
-            raise HTTPException(status_code=400, detail="User not found")
-        
         # Send OTP (non-blocking)
         try:
             if otp_method == "email":
@@ -117,6 +107,10 @@ async def resend_otp(data: ResendOTP, db: Session = Depends(get_db)):
             else:
                 send_otp_sms(user.phone_number, otp)
                 return {"message": "OTP sent to your phone"}
+        except asyncio.QueueFull:
+            # The mail queue is full; never fall back to showing the OTP
+            print(f"Warning: Mail queue full, OTP for {user.email} not sent")
+            raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
         except Exception as send_error:
             print(f"Warning: Failed to send OTP: {send_error}")
             return {"message": f"Your OTP is: {otp}"}
@@ -128,8 +122,8 @@ async def resend_otp(data: ResendOTP, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to resend OTP: {str(e)}")
 
 @router.post("/login/client", response_model=Token, tags=["Authentication"])
-async def login_client(credentials: Login, db: Session = Depends(get_db)):
-    user = Client.get_by_email(db, credentials.email)
+async def login_client(credentials: Login, db: AsyncSession = Depends(get_async_db)):
+    user = await Client.get_by_email(db, credentials.email)
     
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -137,9 +131,15 @@ async def login_client(credentials: Login, db: Session = Depends(get_db)):
     if not user.is_verified:
         raise HTTPException(status_code=403, detail="Please verify your email first")
     
-    if not verify_password(credentials.password, user.password):
+    verified, new_hash = await verify_and_update_password(credentials.password, user.password)
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Stored with a different work factor; upgrade it while we have the plain password
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+    
     access_token = create_access_token(
         data={"sub": str(user.id), "role": "client"}
     )
@@ -150,13 +150,14 @@ async def login_client(credentials: Login, db: Session = Depends(get_db)):
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post("/refresh", response_model=Token, tags=["Authentication"])
-async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
     payload = verify_refresh_token(request.refresh_token)
     
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     
-    user = db.query(Client).filter(Client.id == payload.get("sub")).first()
+    result = await db.execute(select(Client).where(Client.id == payload.get("sub")))
+    user = result.scalars().first()
     
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -171,10 +172,7 @@ async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.get("/client/profile", tags=["Client"])
-async def get_client_profile(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Client not found")
+async def get_client_profile(user: ClientSnapshot = Depends(get_current_client)):
     return {
         "id": user.id,
         "email": user.email,
@@ -194,14 +192,15 @@ async def update_client_profile(
     address: str = Form(None),
     profile_photo: UploadFile = File(None),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(Client).filter(Client.id == current_user.get("sub")).first()
+    result = await db.execute(select(Client).where(Client.id == current_user.get("sub")))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="Client not found")
     
     if email:
-        existing = Client.get_by_email(db, email)
+        existing = await Client.get_by_email(db, email)
         if existing and existing.id != user.id:
             raise HTTPException(status_code=400, detail="Email already in use")
         user.email = email
@@ -213,8 +212,9 @@ async def update_client_profile(
         photo_url = storage.upload_client_profile_photo(profile_photo.file, str(user.id), profile_photo.filename)
         user.profile_photo = photo_url
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    client_cache.invalidate(user.id)
     return {
         "id": user.id,
         "email": user.email,
@@ -230,24 +230,19 @@ async def update_client_profile(
 
 
 @router.post("/forgot-password", response_model=MessageResponse, tags=["Authentication"])
-async def forgot_password(data: ForgotPassword, db: Session = Depends(get_db)):
+async def forgot_password(data: ForgotPassword, db: AsyncSession = Depends(get_async_db)):
     try:
         import random
         from datetime import datetime, timedelta
         
-        # Try email first
-        user = Client.get_by_email(db, data.identifier)
-        
-        # If not found, try phone
-        if not user:
-            user = db.query(Client).filter(Client.phone_number == data.identifier).first()
+        user = await Client.get_by_identifier(db, data.identifier)
         
         if user and user.is_verified:
             otp = str(random.randint(1000, 9999))
             user.reset_otp = otp
             user.reset_otp_expiry = datetime.utcnow() + timedelta(minutes=5)
             user.otp_method = data.otp_method
-            db.commit()
+            await db.commit()
             
             # Send OTP (non-blocking)
             try:
@@ -255,26 +250,26 @@ async def forgot_password(data: ForgotPassword, db: Session = Depends(get_db)):
                     send_otp_email(user.email, otp)
                 else:
                     send_otp_sms(user.phone_number, otp)
+            except asyncio.QueueFull:
+                print(f"Warning: Mail queue full, forgot password OTP for {user.email} not sent")
+                raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
             except Exception as send_error:
                 print(f"Warning: Failed to send forgot password OTP: {send_error}")
         
         return {"message": "If account exists, OTP has been sent"}
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Forgot password error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process request: {str(e)}")
 
 @router.post("/verify-forgot-otp", response_model=MessageResponse, tags=["Authentication"])
-async def verify_forgot_otp(data: VerifyForgotOTP, db: Session = Depends(get_db)):
+async def verify_forgot_otp(data: VerifyForgotOTP, db: AsyncSession = Depends(get_async_db)):
     import secrets
     from datetime import datetime, timedelta
     
-    # Try email first
-    user = Client.get_by_email(db, data.identifier)
-    
-    # If not found, try phone
-    if not user:
-        user = db.query(Client).filter(Client.phone_number == data.identifier).first()
+    user = await Client.get_by_identifier(db, data.identifier)
     
     if not user:
         raise HTTPException(status_code=400, detail="Invalid OTP")
@@ -291,12 +286,12 @@ async def verify_forgot_otp(data: VerifyForgotOTP, db: Session = Depends(get_db)
     user.reset_otp = None
     user.reset_otp_expiry = None
     
-    db.commit()
+    await db.commit()
     
     return {"message": f"OTP verified. Reset token: {reset_token}"}
 
 @router.post("/reset-password", response_model=MessageResponse, tags=["Authentication"])
-async def reset_password(data: ResetPassword, db: Session = Depends(get_db)):
+async def reset_password(data: ResetPassword, db: AsyncSession = Depends(get_async_db)):
     from datetime import datetime
     
     if data.new_password != data.confirm_password:
@@ -305,7 +300,8 @@ async def reset_password(data: ResetPassword, db: Session = Depends(get_db)):
     if len(data.new_password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
     
-    user = db.query(Client).filter(Client.reset_token == data.reset_token).first()
+    result = await db.execute(select(Client).where(Client.reset_token == data.reset_token))
+    user = result.scalars().first()
     
     if not user:
         raise HTTPException(status_code=400, detail="Invalid reset token")
@@ -313,10 +309,11 @@ async def reset_password(data: ResetPassword, db: Session = Depends(get_db)):
     if user.reset_token_expiry < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Reset token expired")
     
-    user.password = hash_password(data.new_password)
+    user.password = await hash_password_async(data.new_password)
     user.reset_token = None
     user.reset_token_expiry = None
     
-    db.commit()
+    await db.commit()
+    client_cache.invalidate(user.id)
     
     return {"message": "Password reset successfully"}
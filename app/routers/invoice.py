@@ -1,80 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from app.database.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.db import get_async_db
 from app.models.invoice import Invoice
-from app.models.client import Client
 from app.models.job import Job
-from app.core.security import get_current_user
-from typing import List
+from app.core.client_cache import ClientSnapshot, get_current_client
+from app.core.reference_cache import reference_cache, etag_matches
+from app.core.cache import DiskLRUCache, LRUCache
+from app.core.invoice_render import InvoiceData, render_invoice_pdf
+from app.core.pagination import PageParams, keyset_page
+from typing import List, Optional
+import asyncio
+import hashlib
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import re
 
 router = APIRouter()
 
-def generate_invoice_pdf(invoice: Invoice, client: Client, pdf_path: str):
-    """Generate a simple invoice PDF"""
-    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-    
-    c = canvas.Canvas(pdf_path, pagesize=letter)
-    width, height = letter
-    
-    # Title
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(50, height - 50, "INVOICE")
-    
-    # Invoice details
-    c.setFont("Helvetica", 12)
-    c.drawString(50, height - 100, f"Invoice Number: {invoice.invoice_number}")
-    c.drawString(50, height - 120, f"Job ID: {invoice.job_id}")
-    c.drawString(50, height - 140, f"Date: {invoice.generated_at.strftime('%Y-%m-%d')}")
+# Redirect downloads to a presigned storage URL instead of streaming them through the API
+INVOICE_DOWNLOAD_REDIRECT = os.getenv("INVOICE_DOWNLOAD_REDIRECT", "false").lower() == "true"
+INVOICE_DOWNLOAD_URL_TTL = int(os.getenv("INVOICE_DOWNLOAD_URL_TTL", "60"))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Invoice statuses shown as "Paid in Full"; anything else counts as outstanding
+PAID_INVOICE_STATUSES = ["paid", "generated"]
+# Local copies of downloaded PDFs, so repeat downloads are served from disk
+INVOICE_CACHE_DIR = os.getenv("INVOICE_CACHE_DIR", "invoices/.cache")
+INVOICE_CACHE_MAX_BYTES = int(os.getenv("INVOICE_CACHE_MAX_MB", "256")) * 1024 * 1024
+# A local copy is served without asking storage for this long after it was last checked
+INVOICE_CACHE_REVALIDATE = int(os.getenv("INVOICE_CACHE_REVALIDATE", "60"))
+
+invoice_pdf_cache = DiskLRUCache(INVOICE_CACHE_DIR, INVOICE_CACHE_MAX_BYTES, suffix=".pdf")
+# Cache keys whose local copy storage confirmed recently
+invoice_pdf_checked = LRUCache(maxsize=10000, ttl=INVOICE_CACHE_REVALIDATE)
+
+def _iter_body(body):
+    """Read a storage body in chunks; StreamingResponse runs this in the threadpool"""
+    try:
+        yield from body.iter_chunks(DOWNLOAD_CHUNK_SIZE)
+    finally:
+        body.close()
+
+def _cached_invoice_pdf(invoice: Invoice):
+    """
+    (path, ETag) of a local copy of the invoice PDF, fetching it on a miss.
+    Entries are keyed by invoice id and a hash of the stored object path, and
+    tagged with the storage ETag (the content hash). Re-rendered invoices are
+    uploaded to the same path, so a copy older than INVOICE_CACHE_REVALIDATE
+    seconds is checked with a conditional GET: a 304 keeps it, new content
+    replaces it. Returns None if the PDF cannot be cached, in which case the
+    caller streams it instead.
+    """
+    from app.core.storage import storage
+    from botocore.exceptions import ClientError
     
-    # Client details
-    c.drawString(50, height - 180, "Bill To:")
-    c.drawString(50, height - 200, f"{client.full_name}")
-    c.drawString(50, height - 220, f"{client.company_name}")
-    c.drawString(50, height - 240, f"{client.email}")
+    key = f"{invoice.id}-{hashlib.sha256(invoice.pdf_path.encode()).hexdigest()[:16]}"
+    cached = invoice_pdf_cache.get(key)
+    if cached and invoice_pdf_checked.get(key):
+        path, tag = cached
+        return path, f'"{tag}"'
     
-    # Amount
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, height - 300, f"Total Amount: £{float(invoice.amount):.2f}")
+    try:
+        obj = storage.open_file(invoice.pdf_path, if_none_match=f'"{cached[1]}"' if cached else None)
+    except ClientError as e:
+        if not cached or e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") != status.HTTP_304_NOT_MODIFIED:
+            raise
+        # Unchanged in storage
+        invoice_pdf_checked.set(key, True)
+        path, tag = cached
+        return path, f'"{tag}"'
     
-    # Footer
-    c.setFont("Helvetica", 10)
-    c.drawString(50, 50, "Thank you for your business!")
+    tag = re.sub(r"[^A-Za-z0-9-]", "", obj.get("ETag") or "")
+    if not tag or obj["ContentLength"] > invoice_pdf_cache.max_bytes:
+        obj["Body"].close()
+        return None
+    path = invoice_pdf_cache.put(key, tag, _iter_body(obj["Body"]))
+    invoice_pdf_checked.set(key, True)
+    return path, f'"{tag}"'
+
+def generate_invoice_pdf(invoice: Invoice, client: ClientSnapshot, pdf_path: str):
+    """Generate a simple invoice PDF"""
+    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
     
-    c.save()
+    with open(pdf_path, "wb") as f:
+        f.write(render_invoice_pdf(InvoiceData.from_models(invoice, client)))
 
 @router.get("/client/invoices", tags=["Client"])
 async def get_invoice_history(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get client from database
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Client not found"
-        )
+    # Totals over all of the client's invoices, computed in SQL
+    outstanding = case((Invoice.status.in_(PAID_INVOICE_STATUSES), 0), else_=Invoice.amount)
+    result = await db.execute(
+        select(
+            func.count(Invoice.id),
+            func.coalesce(func.sum(Invoice.amount), 0),
+            func.coalesce(func.sum(outstanding), 0)
+        ).where(Invoice.client_id == client.id)
+    )
+    total_invoices, total_billed, total_outstanding = result.one()
+    
+    # One page of invoices with their job details in a single query
+    rows, next_cursor = await keyset_page(
+        db,
+        select(Invoice, Job.service_type, Job.property_address)
+        .outerjoin(Job, Job.id == Invoice.job_id)
+        .where(Invoice.client_id == client.id),
+        Invoice.generated_at,
+        Invoice.id,
+        page,
+        response,
+        scalars=False
+    )
     
-    # Get all invoices for this client with job details
-    invoices = db.query(Invoice).filter(
-        Invoice.client_id == client.id
-    ).order_by(Invoice.generated_at.desc()).all()
+    service_types = await reference_cache.get_async(db, "service_types")
     
     invoice_list = []
-    for invoice in invoices:
-        job = db.query(Job).filter(Job.id == invoice.job_id).first()
-        
-        # Get service type name from database
+    for invoice, job_service_type, job_property_address in rows:
+        # Get service type name from the reference cache
         service_type_name = "Unknown Service"
-        if job and job.service_type:
-            from app.models.service_type import ServiceType
-            service = db.query(ServiceType).filter(ServiceType.id == job.service_type).first()
-            if service:
-                service_type_name = service.name
+        if job_service_type:
+            service_type_name = service_types.name_of(job_service_type, "Unknown Service")
         
         invoice_list.append({
             "invoice_id": invoice.id,
@@ -83,31 +132,28 @@ async def get_invoice_history(
             "service_type": service_type_name,
             "invoice_date": invoice.generated_at.strftime("%d %b %Y"),
             "total_amount": float(invoice.amount),
-            "payment_status": "Paid in Full" if invoice.status in ["paid", "generated"] else invoice.status.title(),
-            "property_address": job.property_address if job else "N/A"
+            "payment_status": "Paid in Full" if invoice.status in PAID_INVOICE_STATUSES else invoice.status.title(),
+            "property_address": job_property_address or "N/A"
         })
     
     return {
-        "total_invoices": len(invoice_list),
-        "invoices": invoice_list
+        "total_invoices": total_invoices,
+        "total_billed": float(total_billed),
+        "total_outstanding": float(total_outstanding),
+        "invoices": invoice_list,
+        "next_cursor": next_cursor
     }
 
 @router.get("/client/invoices/{invoice_id}/download", tags=["Client"])
 async def download_invoice(
     invoice_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    byte_range: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    from fastapi.responses import RedirectResponse
-    
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Client not found"
-        )
-    
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    result = await db.execute(select(Invoice).where(Invoice.id == invoice_id))
+    invoice = result.scalars().first()
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,19 +166,61 @@ async def download_invoice(
             detail="Access denied: Invoice does not belong to you"
         )
     
-    # Download PDF from Utho and stream to client
+    # Stream the PDF from Utho, or redirect the client to a short-lived storage URL
     if invoice.pdf_path and invoice.pdf_path.startswith("http"):
         from app.core.storage import storage
-        import io
-        from fastapi.responses import StreamingResponse
+        from botocore.exceptions import ClientError
+        
+        filename = f"{invoice.invoice_number}.pdf"
+        if INVOICE_DOWNLOAD_REDIRECT:
+            url = await asyncio.to_thread(
+                storage.presigned_download_url, invoice.pdf_path, filename, INVOICE_DOWNLOAD_URL_TTL
+            )
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        
+        try:
+            cached = await asyncio.to_thread(_cached_invoice_pdf, invoice)
+        except Exception as e:
+            print(f"Invoice PDF cache unavailable: {e}")
+            cached = None
+        if cached:
+            path, etag = cached
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            # FileResponse handles Range itself and uses sendfile where the server supports it
+            return FileResponse(path, media_type="application/pdf", filename=filename, headers={"ETag": etag})
+        
+        try:
+            obj = await asyncio.to_thread(storage.open_file, invoice.pdf_path, byte_range, if_none_match)
+        except ClientError as e:
+            code = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if code == status.HTTP_304_NOT_MODIFIED:
+                # The header may list several tags or be "*", so answer with the tag storage matched
+                etag = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("etag")
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag} if etag else None)
+            if code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE:
+                return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            print(f"Error downloading file: {e}")
+            obj = None
+        except Exception as e:
+            print(f"Error downloading file: {e}")
+            obj = None
         
-        # Download from Utho
-        pdf_content = storage.download_file(invoice.pdf_path)
-        if pdf_content:
+        if obj:
+            headers = {
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(obj["ContentLength"]),
+                "Accept-Ranges": "bytes",
+            }
+            if obj.get("ETag"):
+                headers["ETag"] = obj["ETag"]
+            if obj.get("ContentRange"):
+                headers["Content-Range"] = obj["ContentRange"]
             return StreamingResponse(
-                io.BytesIO(pdf_content),
+                _iter_body(obj["Body"]),
+                status_code=status.HTTP_206_PARTIAL_CONTENT if obj.get("ContentRange") else status.HTTP_200_OK,
                 media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={invoice.invoice_number}.pdf"}
+                headers=headers
             )
     
     # If no PDF, return invoice details as JSON
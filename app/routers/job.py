@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from app.database.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.db import get_async_db
 from app.models.job import Job
-from app.models.client import Client
 from app.schemas.job import CreateJob, JobResponse
-from app.core.security import get_current_user
+from app.core.client_cache import ClientSnapshot, get_current_client
 from app.core.pricing import calculate_job_price
 from app.core.storage import storage
-from app.core.location import geocode_address, haversine_distance
+from app.core.location import geocode_address_async
+from app.core.dispatcher import crew_dispatcher, DispatchRequest
+from app.core.reference_cache import reference_cache
+from app.core.pagination import PageParams, keyset_page
 from typing import Optional, List
 import os
 
@@ -27,32 +30,26 @@ async def create_request(
     additional_information: Optional[str] = Form(None),
     access_difficulty: Optional[str] = Form(None),
     property_photos: List[UploadFile] = File(default=[]),
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
     if not service_type or not urgency_level or not property_address or not preferred_date or not preferred_time:
         raise HTTPException(status_code=400, detail="service_type, urgency_level, property_address, preferred_date, and preferred_time are required")
     
-    # Get urgency level from database
-    from app.models.urgency_level import UrgencyLevel
-    urgency_level_obj = db.query(UrgencyLevel).filter(UrgencyLevel.id == urgency_level).first()
+    # Validate urgency level against the cached reference data
+    urgency_level_obj = (await reference_cache.get_async(db, "urgency_levels")).get(urgency_level)
     if not urgency_level_obj:
         raise HTTPException(status_code=400, detail="Invalid urgency_level")
     
-    image_paths = []
-    if property_photos:
-        for img in property_photos:
-            if img.filename:
-                photo_url = storage.upload_client_job_photo(img.file, str(client.id), "temp_job", img.filename)
-                if photo_url:
-                    image_paths.append(photo_url)
+    # Upload photos concurrently; failed files are reported back instead of failing the request
+    uploads = await storage.upload_client_job_photos(
+        [(img.file, img.filename) for img in property_photos if img.filename], str(client.id), "temp_job"
+    )
+    image_paths = [photo_url for _, photo_url in uploads if photo_url]
+    failed_photos = [filename for filename, photo_url in uploads if not photo_url]
     
-    # Geocode job address
-    lat, lon = geocode_address(property_address)
+    # Geocode job address (cached, misses run off the event loop)
+    lat, lon = await geocode_address_async(property_address, db)
     
     job = Job(
         client_id=str(client.id),
@@ -73,57 +70,44 @@ async def create_request(
     )
     
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     
-    # Auto-assign to nearest available crew
+    # Crew assignment happens in the background dispatcher, not in the request
     if lat and lon:
-        from sqlalchemy import text
-        crews = db.execute(
-            text("SELECT id, email, full_name, latitude, longitude FROM crew WHERE status = 'available' AND is_approved = true AND latitude IS NOT NULL AND longitude IS NOT NULL")
-        ).fetchall()
-        
-        if crews:
-            nearest_crew = min(crews, key=lambda c: haversine_distance(lat, lon, c[3], c[4]))
-            job.assigned_crew_id = nearest_crew[0]
-            job.status = 'crew-dispatched'
-            db.execute(text("UPDATE crew SET status = 'assigned' WHERE id = :crew_id"), {"crew_id": nearest_crew[0]})
-            db.commit()
-            db.refresh(job)
-            
-            # Send notification email
-            from app.core.email import send_job_assignment_email
-            send_job_assignment_email(nearest_crew[1], nearest_crew[2], job.id, property_address, preferred_date)
+        crew_dispatcher.enqueue(DispatchRequest(job.id, lat, lon, property_address, preferred_date))
     
-    return job
+    response = JobResponse.model_validate(job)
+    response.photo_upload_errors = failed_photos or None
+    return response
 
 @router.get("/jobs", tags=["Jobs"], summary="Active Jobs - Currently in Progress")
 async def get_all_requests(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    from sqlalchemy import text
     from datetime import datetime, timedelta
-    from app.models.service_type import ServiceType
-    from app.models.urgency_level import UrgencyLevel
     
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
+    jobs, _ = await keyset_page(
+        db, select(Job).where(Job.client_id == str(client.id)),
+        Job.created_at, Job.id, page, response
+    )
     
-    jobs = db.query(Job).filter(Job.client_id == str(client.id)).order_by(Job.created_at.desc()).all()
+    # Service type names and SLA hours come from the in-memory reference cache
+    service_types = await reference_cache.get_async(db, "service_types")
+    urgency_levels = await reference_cache.get_async(db, "urgency_levels")
     
     result = []
     for job in jobs:
-        # Get service type name
-        service = db.query(ServiceType).filter(ServiceType.id == job.service_type).first()
-        service_type_name = service.name if service else "Unknown Service"
+        service_type_name = service_types.name_of(job.service_type, "Unknown Service")
         
         # Get SLA hours from urgency level
         sla_hours = 24  # default
-        urgency_level = db.query(UrgencyLevel).filter(UrgencyLevel.id == job.urgency_level).first()
+        urgency_level = urgency_levels.get(job.urgency_level)
         if urgency_level:
-            sla_hours = urgency_level.sla_hours
+            sla_hours = urgency_level["sla_hours"]
         
         # Calculate SLA status
         sla_deadline = job.created_at + timedelta(hours=sla_hours)
@@ -162,14 +146,11 @@ async def submit_job_rating(
     job_id: str,
     rating: float = Form(...),
     review: Optional[str] = Form(None),
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(Job.id == job_id, Job.client_id == str(client.id)).first()
+    result = await db.execute(select(Job).where(Job.id == job_id, Job.client_id == str(client.id)))
+    job = result.scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -183,7 +164,7 @@ async def submit_job_rating(
         raise HTTPException(status_code=400, detail="Job already rated")
     
     job.rating = rating
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Rating submitted successfully",
@@ -194,14 +175,11 @@ async def submit_job_rating(
 @router.get("/jobs/{job_id}/rating", tags=["Jobs"])
 async def get_job_rating(
     job_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(Job.id == job_id, Job.client_id == str(client.id)).first()
+    result = await db.execute(select(Job).where(Job.id == job_id, Job.client_id == str(client.id)))
+    job = result.scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -215,26 +193,23 @@ async def get_job_rating(
 async def cancel_job(
     job_id: str,
     cancellation_reason: str = Form(...),
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    from sqlalchemy import text
     from app.models.payment import Payment
     
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(Job.id == job_id, Job.client_id == str(client.id)).first()
+    result = await db.execute(select(Job).where(Job.id == job_id, Job.client_id == str(client.id)))
+    job = result.scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Check if deposit payment exists and is completed
-    deposit_payment = db.query(Payment).filter(
+    result = await db.execute(select(Payment).where(
         Payment.job_id == job_id,
         Payment.payment_type == "deposit",
         Payment.payment_status == "completed"
-    ).first()
+    ))
+    deposit_payment = result.scalars().first()
     
     if deposit_payment:
         raise HTTPException(
@@ -252,14 +227,14 @@ async def cancel_job(
     
     # If crew was assigned, set them back to available
     if job.assigned_crew_id:
-        db.execute(
+        await db.execute(
             text("UPDATE crew SET status = 'available' WHERE id = :crew_id"),
             {"crew_id": job.assigned_crew_id}
         )
     
     job.status = 'cancelled'
     job.cancellation_reason = cancellation_reason
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Job cancelled successfully. No charges applied.",
@@ -270,24 +245,24 @@ async def cancel_job(
 
 @router.get("/client/quotes", tags=["Client"], summary="Get All Quotes for Client")
 async def get_client_quotes(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
+    jobs, _ = await keyset_page(
+        db, select(Job).where(
+            Job.client_id == str(client.id),
+            Job.status.in_(["quote_sent", "quote_accepted", "quote_rejected"])
+        ),
+        Job.created_at, Job.id, page, response
+    )
     
-    jobs = db.query(Job).filter(
-        Job.client_id == str(client.id),
-        Job.status.in_(["quote_sent", "quote_accepted", "quote_rejected"])
-    ).order_by(Job.created_at.desc()).all()
+    service_types = await reference_cache.get_async(db, "service_types")
     
     result = []
     for job in jobs:
-
-        from app.models.service_type import ServiceType
-        service = db.query(ServiceType).filter(ServiceType.id == job.service_type).first()
-        service_type_name = service.name if service else "Unknown"
+        service_type_name = service_types.name_of(job.service_type)
         
         result.append({
             "job_id": job.id,
@@ -306,30 +281,23 @@ async def get_client_quotes(
 @router.get("/client/quotes/{job_id}", tags=["Client"], summary="Get Quote Details by ID")
 async def get_quote_by_id(
     job_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job).where(
         Job.id == job_id,
         Job.client_id == str(client.id)
-    ).first()
+    ))
+    job = result.scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Quote not found")
     
-    # Get service type name
-    from app.models.service_type import ServiceType
-    service = db.query(ServiceType).filter(ServiceType.id == job.service_type).first()
-    service_type_name = service.name if service else "Unknown"
-    
-    # Get urgency level name
-    from app.models.urgency_level import UrgencyLevel
-    urgency = db.query(UrgencyLevel).filter(UrgencyLevel.id == job.urgency_level).first()
-    urgency_name = urgency.name if urgency else ""
+    # Get service type and urgency level names
+    service_types = await reference_cache.get_async(db, "service_types")
+    urgency_levels = await reference_cache.get_async(db, "urgency_levels")
+    service_type_name = service_types.name_of(job.service_type)
+    urgency_name = urgency_levels.name_of(job.urgency_level, "")
     
     return {
         "job_id": job.id,
@@ -348,17 +316,14 @@ async def get_quote_by_id(
 @router.post("/client/quotes/{job_id}/approve", tags=["Client"], summary="Approve Quote")
 async def approve_quote(
     job_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job).where(
         Job.id == job_id,
         Job.client_id == str(client.id)
-    ).first()
+    ))
+    job = result.scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Quote not found")
@@ -367,7 +332,7 @@ async def approve_quote(
         raise HTTPException(status_code=400, detail="Quote already processed")
     
     job.status = "quote_accepted"
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Quote approved successfully",
@@ -379,17 +344,14 @@ async def approve_quote(
 async def decline_quote(
     job_id: str,
     decline_reason: str = Form(...),
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job).where(
         Job.id == job_id,
         Job.client_id == str(client.id)
-    ).first()
+    ))
+    job = result.scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Quote not found")
@@ -399,7 +361,7 @@ async def decline_quote(
     
     job.status = "quote_rejected"
     job.decline_reason = decline_reason
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Quote declined",
@@ -410,25 +372,25 @@ async def decline_quote(
 
 @router.get("/client/tracking", tags=["Client"], summary="Job Tracking - Get All Active Jobs")
 async def get_job_tracking(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
     # Get all jobs including completed (exclude only cancelled)
-    jobs = db.query(Job).filter(
-        Job.client_id == str(client.id),
-        Job.status != "cancelled"
-    ).order_by(Job.created_at.desc()).all()
+    jobs, _ = await keyset_page(
+        db, select(Job).where(
+            Job.client_id == str(client.id),
+            Job.status != "cancelled"
+        ),
+        Job.created_at, Job.id, page, response
+    )
+    
+    service_types = await reference_cache.get_async(db, "service_types")
     
     result = []
     for job in jobs:
-        # Get service type name
-        from app.models.service_type import ServiceType
-        service = db.query(ServiceType).filter(ServiceType.id == job.service_type).first()
-        service_name = service.name if service else "Unknown"
+        service_name = service_types.name_of(job.service_type)
         
         # Determine display status
         if job.status == "job_created":
@@ -465,32 +427,39 @@ async def get_job_tracking(
 
 @router.get("/client/history", tags=["Client"], summary="Job History - Get All Completed Jobs")
 async def get_job_history(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
     # Get all jobs (including active, completed, cancelled)
-    jobs = db.query(Job).filter(
-        Job.client_id == str(client.id)
-    ).order_by(Job.created_at.desc()).all()
+    jobs, _ = await keyset_page(
+        db, select(Job).where(
+            Job.client_id == str(client.id)
+        ),
+        Job.created_at, Job.id, page, response
+    )
+    
+    from app.models.payment import Payment
+    
+    service_types = await reference_cache.get_async(db, "service_types")
+    
+    # Resolve completed deposits for the whole page in one query
+    paid_job_ids = set()
+    if jobs:
+        paid_result = await db.execute(select(Payment.job_id).where(
+            Payment.job_id.in_([job.id for job in jobs]),
+            Payment.payment_type == "deposit",
+            Payment.payment_status == "completed"
+        ).distinct())
+        paid_job_ids = set(paid_result.scalars().all())
     
     result = []
     for job in jobs:
-        from app.models.service_type import ServiceType
-        from app.models.payment import Payment
-        
-        service = db.query(ServiceType).filter(ServiceType.id == job.service_type).first()
-        service_name = service.name if service else "Unknown"
+        service_name = service_types.name_of(job.service_type)
         
         # Check payment status
-        deposit_payment = db.query(Payment).filter(
-            Payment.job_id == job.id,
-            Payment.payment_type == "deposit",
-            Payment.payment_status == "completed"
-        ).first()
+        deposit_paid = job.id in paid_job_ids
         
         # Determine status badge
         if job.status == "job_created":
@@ -499,7 +468,7 @@ async def get_job_history(
         elif job.status == "quote_sent":
             status_badge = "Quote Sent"
             status_color = "info"
-        elif job.status == "quote_accepted" and deposit_payment:
+        elif job.status == "quote_accepted" and deposit_paid:
             status_badge = "Paid - Crew Assignment"
             status_color = "success"
         elif job.status == "quote_accepted":
@@ -528,7 +497,7 @@ async def get_job_history(
         workflow_steps = [
             {"name": "Request", "completed": True},
             {"name": "Quote", "completed": job.status not in ["job_created"]},
-            {"name": "Payment", "completed": deposit_payment is not None},
+            {"name": "Payment", "completed": deposit_paid},
             {"name": "Crew", "completed": job.status in ["crew_assigned", "crew_arrived", "before_photo", "clearance_in_progress", "after_photo", "work_completed", "job_completed"]},
             {"name": "Work", "completed": job.status in ["before_photo", "clearance_in_progress", "after_photo", "work_completed", "job_completed"]},
             {"name": "Complete", "completed": job.status == "job_completed"}
@@ -547,18 +516,19 @@ async def get_job_history(
 
 @router.get("/client/completed-jobs", tags=["Client"], summary="Recently Completed Jobs")
 async def get_completed_jobs(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
     # Get completed jobs
-    jobs = db.query(Job).filter(
-        Job.client_id == str(client.id),
-        Job.status == "job_completed"
-    ).order_by(Job.updated_at.desc()).all()
+    jobs, _ = await keyset_page(
+        db, select(Job).where(
+            Job.client_id == str(client.id),
+            Job.status == "job_completed"
+        ),
+        Job.updated_at, Job.id, page, response
+    )
     
     completed_jobs = []
     for job in jobs:
@@ -581,19 +551,14 @@ async def get_completed_jobs(
 @router.get("/client/tracking/{job_id}", tags=["Client"], summary="Get Job Tracking Details by ID")
 async def get_job_tracking_details(
     job_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    from sqlalchemy import text
-    
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job).where(
         Job.id == job_id,
         Job.client_id == str(client.id)
-    ).first()
+    ))
+    job = result.scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -644,17 +609,17 @@ async def get_job_tracking_details(
     crew_details = None
     if job.assigned_crew_id:
         try:
-            crew_result = db.execute(
+            crew_result = (await db.execute(
                 text("SELECT full_name, phone_number, email FROM crew WHERE id = :id"),
                 {"id": job.assigned_crew_id}
-            ).fetchone()
+            )).fetchone()
             
             if crew_result:
                 # Get crew rating (average of all completed jobs)
-                rating_result = db.execute(
+                rating_result = (await db.execute(
                     text("SELECT AVG(rating) FROM jobs WHERE assigned_crew_id = :id AND rating IS NOT NULL"),
                     {"id": job.assigned_crew_id}
-                ).fetchone()
+                )).fetchone()
                 
                 crew_details = {
                     "name": crew_result[0],
@@ -675,18 +640,19 @@ async def get_job_tracking_details(
 
 @router.get("/client/payment-requests", tags=["Client"], summary="Get Pending Payment Requests")
 async def get_payment_requests(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    client: ClientSnapshot = Depends(get_current_client),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    client = db.query(Client).filter(Client.id == current_user.get("sub")).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
     # Get jobs with work_completed status (awaiting final payment)
-    jobs = db.query(Job).filter(
-        Job.client_id == str(client.id),
-        Job.status == "work_completed"
-    ).order_by(Job.updated_at.desc()).all()
+    jobs, _ = await keyset_page(
+        db, select(Job).where(
+            Job.client_id == str(client.id),
+            Job.status == "work_completed"
+        ),
+        Job.updated_at, Job.id, page, response
+    )
     
     result = []
     for job in jobs:
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from app.database.db import get_db
 from app.core.security import verify_token
 from app.models.job import Job
-from app.models.urgency_level import UrgencyLevel
+from app.core.reference_cache import reference_cache
 from app.schemas.job_draft import JobResponse, ConfirmJob
 from app.schemas.auth import MessageResponse
 from typing import List, Optional
@@ -86,8 +86,8 @@ async def create_job_draft(
 ):
     """Create job draft without authentication - for price estimation"""
     try:
-        # Get urgency level from database
-        urgency_level_obj = db.query(UrgencyLevel).filter(UrgencyLevel.id == urgency_level).first()
+        # Validate urgency level against the cached reference data
+        urgency_level_obj = reference_cache.get(db, "urgency_levels").get(urgency_level)
         if not urgency_level_obj:
             raise HTTPException(status_code=400, detail="Invalid urgency_level")
         
@@ -1,10 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
-from app.core.pricing import calculate_job_price
+from app.core.pricing import price_breakdown, calculate_job_prices, current_pricing
 
 router = APIRouter()
 
+MAX_BATCH_ESTIMATES = 1000
+
 class PriceEstimateRequest(BaseModel):
     property_size: Optional[str] = None
     van_loads: int = 1
@@ -19,7 +21,7 @@ async def estimate_price(request: PriceEstimateRequest):
     """
     Calculate instant price estimate based on job details.
     
-    Components:
+    Components (defaults; the active pricing rule set decides):
     - Base: £250
     - Property: studio/1bed=+£100, 2bed=+£200, 3bed=+£350, 4+bed=+£500
     - Van loads: 1=+£150, 2=+£300, 3=+£450, 4+=+£600
@@ -29,7 +31,7 @@ async def estimate_price(request: PriceEstimateRequest):
     - Compliance: photo=+£50, council_pack=+£100, bio_clean=+£250
     - Minimum: £350
     """
-    price = calculate_job_price(
+    breakdown = price_breakdown(
         property_size=request.property_size,
         van_loads=request.van_loads,
         waste_type=request.waste_type,
@@ -40,10 +42,10 @@ async def estimate_price(request: PriceEstimateRequest):
     )
     
     return {
-        "estimated_price": price,
+        "estimated_price": breakdown.total,
         "currency": "GBP",
         "breakdown": {
-            "base_callout": 250.0,
+            "base_callout": breakdown.base,
             "property_size": request.property_size,
             "van_loads": request.van_loads,
             "waste_type": request.waste_type,
@@ -51,6 +53,26 @@ async def estimate_price(request: PriceEstimateRequest):
             "access_difficulty": request.access_difficulty or [],
             "urgency": request.urgency,
             "compliance_addons": request.compliance_addons or [],
-            "minimum_charge": 350.0
-        }
+            "minimum_charge": breakdown.minimum_charge
+        },
+        "components": breakdown.as_dict()
+    }
+
+@router.post("/estimate-price/batch", tags=["Pricing"], include_in_schema=False)
+async def estimate_prices(requests: List[PriceEstimateRequest]):
+    """
+    Price estimates for up to 1000 jobs at once, in request order.
+    Each price is the same as /estimate-price would return for that job.
+    """
+    if len(requests) > MAX_BATCH_ESTIMATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ESTIMATES} estimates per request")
+    
+    pricing = current_pricing()
+    prices = calculate_job_prices((request.model_dump() for request in requests), pricing)
+    
+    return {
+        "estimated_prices": prices,
+        "currency": "GBP",
+        "count": len(prices),
+        "pricing_version": pricing.version
     }
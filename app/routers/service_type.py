@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.database.db import get_db
-from app.models.service_type import ServiceType
+from app.core.reference_cache import reference_cache, etag_matches
 
 router = APIRouter()
 
 @router.get("/service-types", tags=["Service Types"])
-def get_service_types(db: Session = Depends(get_db)):
-    service_types = db.query(ServiceType).filter(ServiceType.is_active == True).all()
-    return service_types
+def get_service_types(request: Request, response: Response, db: Session = Depends(get_db)):
+    snapshot = reference_cache.get(db, "service_types")
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=snapshot.headers)
+    response.headers.update(snapshot.headers)
+    return snapshot.active
 
 @router.get("/service-types/{service_type_id}", tags=["Service Types"])
 def get_service_type_by_id(service_type_id: int, db: Session = Depends(get_db)):
-    service_type = db.query(ServiceType).filter(ServiceType.id == service_type_id).first()
+    service_type = reference_cache.get(db, "service_types").get(service_type_id)
     if not service_type:
         raise HTTPException(status_code=404, detail="Service type not found")
     return service_type
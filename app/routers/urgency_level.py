@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from app.database.db import get_db
-from app.models.urgency_level import UrgencyLevel
+from app.core.reference_cache import reference_cache, etag_matches
 from app.schemas.urgency_level import UrgencyLevelResponse
 from typing import List
 
 router = APIRouter()
 
 @router.get("/urgency-levels", response_model=List[UrgencyLevelResponse], tags=["Urgency Levels"])
-async def get_urgency_levels(db: Session = Depends(get_db)):
-    urgency_levels = db.query(UrgencyLevel).filter(UrgencyLevel.is_active == True).all()
+async def get_urgency_levels(request: Request, response: Response, db: Session = Depends(get_db)):
+    snapshot = reference_cache.get(db, "urgency_levels")
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=snapshot.headers)
+    response.headers.update(snapshot.headers)
     return [UrgencyLevelResponse(
-        id=str(ul.id),
-        name=ul.name,
-        sla_hours=ul.sla_hours,
-        is_active=ul.is_active
-    ) for ul in urgency_levels]
+        id=str(ul["id"]),
+        name=ul["name"],
+        sla_hours=ul["sla_hours"],
+        is_active=ul["is_active"]
+    ) for ul in snapshot.active]
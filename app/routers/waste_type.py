@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.database.db import get_db
-from app.models.waste_type import WasteType
+from app.core.reference_cache import reference_cache, etag_matches
 
 router = APIRouter()
 
 @router.get("/waste-types", tags=["Waste Types"])
-def get_waste_types(db: Session = Depends(get_db)):
-    waste_types = db.query(WasteType).filter(WasteType.is_active == True).all()
-    return waste_types
+def get_waste_types(request: Request, response: Response, db: Session = Depends(get_db)):
+    snapshot = reference_cache.get(db, "waste_types")
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=snapshot.headers)
+    response.headers.update(snapshot.headers)
+    return snapshot.active
 
 @router.get("/waste-types/{waste_type_id}", tags=["Waste Types"])
 def get_waste_type_by_id(waste_type_id: int, db: Session = Depends(get_db)):
-    waste_type = db.query(WasteType).filter(WasteType.id == waste_type_id).first()
+    waste_type = reference_cache.get(db, "waste_types").get(waste_type_id)
     if not waste_type:
         raise HTTPException(status_code=404, detail="Waste type not found")
     return waste_type
@@ -34,6 +34,8 @@ class JobResponse(BaseModel):
     rating: Optional[float] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    # Filenames of property photos that could not be uploaded (create only)
+    photo_upload_errors: Optional[List[str]] = None
     
     class Config:
         from_attributes = True
@@ -0,0 +1,100 @@
+"""Benchmark for concurrent request throughput on one worker, sync vs async sessions
+
+Serves two endpoints from one in-process ASGI app. Both run the same query,
+which takes BENCH_QUERY_MS in the database (pg_sleep):
+- before: an async def handler on the blocking psycopg2 session (get_db),
+  the pattern the job, invoice and auth routers used to follow
+- after: the same handler on AsyncSession (get_async_db)
+BENCH_REQUESTS requests are sent to each, BENCH_CONCURRENCY at a time, and
+the requests per second are compared. Needs the Postgres database from
+DATABASE_URL; nothing is written to it.
+
+Keep BENCH_CONCURRENCY below the sync pool size (pool_size + max_overflow,
+15). Beyond that the old pattern stalls completely: a blocked checkout holds
+the event loop, so no finished request can return its connection until the
+pool timeout.
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.db import get_async_db, get_db
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "200"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "10"))
+QUERY_MS = float(os.getenv("BENCH_QUERY_MS", "20"))
+
+QUERY = text("SELECT pg_sleep(:seconds)")
+
+app = FastAPI()
+
+
+@app.get("/sync")
+async def sync_session(db: Session = Depends(get_db)):
+    # Blocks the event loop for the whole query, as the old routers did
+    db.execute(QUERY, {"seconds": QUERY_MS / 1000})
+    return {"ok": True}
+
+
+@app.get("/async")
+async def async_session(db: AsyncSession = Depends(get_async_db)):
+    await db.execute(QUERY, {"seconds": QUERY_MS / 1000})
+    return {"ok": True}
+
+
+async def run(client: httpx.AsyncClient, path: str) -> float:
+    """Requests per second for REQUESTS requests, CONCURRENCY in flight at a time"""
+    slots = asyncio.Semaphore(CONCURRENCY)
+    statuses = []
+
+    async def one():
+        async with slots:
+            response = await client.get(path)
+            statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    failed = sum(code != 200 for code in statuses)
+    if failed:
+        raise RuntimeError(f"{failed} of {REQUESTS} requests to {path} failed")
+    return REQUESTS / elapsed
+
+
+async def bench() -> int:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # Open the pooled connections before timing
+        await run(client, "/sync")
+        await run(client, "/async")
+        sync_rate = await run(client, "/sync")
+        async_rate = await run(client, "/async")
+
+    print(f"Requests: {REQUESTS}, concurrency: {CONCURRENCY}, query time: {QUERY_MS:.0f} ms, one worker")
+    print(f"Sync session (before):  {sync_rate:,.0f} requests/s")
+    print(f"Async session (after):  {async_rate:,.0f} requests/s ({async_rate / sync_rate:.1f}x)")
+
+    if async_rate <= sync_rate:
+        print("\n❌ The async session path is not faster under concurrency")
+        return 1
+    print("\n✅ Async session path serves concurrent requests faster")
+    return 0
+
+
+def main() -> int:
+    return asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
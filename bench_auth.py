@@ -0,0 +1,67 @@
+"""Benchmark for access-token verification per authenticated request
+
+Times get_current_user with the verified-token cache cleared before every
+call (full JWT decode) and with it warm, for each available JWT backend.
+Also checks that both paths return the same claims and reject bad tokens.
+"""
+import sys
+import os
+import time
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import app.core.security as security
+from app.core.security import JoseBackend, PyJWTBackend, create_access_token, get_current_user, token_cache
+
+REQUESTS = int(os.getenv("BENCH_AUTH_REQUESTS", "5000"))
+
+
+def per_request_us(credentials, clear_cache):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        if clear_cache:
+            token_cache.clear()
+        get_current_user(credentials)
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def main() -> int:
+    backends = [JoseBackend()]
+    if security.PYJWT_AVAILABLE:
+        backends.append(PyJWTBackend())
+
+    failed = False
+    for backend in backends:
+        security.jwt = backend
+        token = create_access_token({"sub": "bench-client", "email": "bench@example.com"})
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        token_cache.clear()
+        expected = get_current_user(credentials)
+        cold = per_request_us(credentials, clear_cache=True)
+        warm = per_request_us(credentials, clear_cache=False)
+        print(f"{backend.name:>6}: full decode {cold:6.1f} µs, cached {warm:5.1f} µs per request ({cold / warm:.0f}x)")
+
+        if get_current_user(credentials) != expected:
+            print(f"❌ {backend.name}: cached claims differ from decoded claims")
+            failed = True
+        try:
+            get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token[:-2] + "xx"))
+            print(f"❌ {backend.name}: tampered token accepted")
+            failed = True
+        except HTTPException:
+            pass
+
+    if failed:
+        return 1
+    print("\n✅ Token verification OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Parity check and micro-benchmark for the batch haversine functions
+
+Compares haversine_distances and haversine_matrix against the scalar
+haversine_distance on random UK coordinates, then times ranking a crew
+roster both ways. Exits non-zero if any distance differs.
+"""
+import sys
+import random
+import timeit
+
+import numpy as np
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.core.location import haversine_distance, haversine_distances, haversine_matrix
+
+TOLERANCE_KM = 1e-6
+CREWS = 5000
+JOBS = 200
+
+
+def random_points(n):
+    return [random.uniform(49.9, 58.7) for _ in range(n)], [random.uniform(-7.6, 1.8) for _ in range(n)]
+
+
+def main() -> int:
+    random.seed(42)
+    crew_lats, crew_lons = random_points(CREWS)
+    job_lats, job_lons = random_points(JOBS)
+    lat, lon = job_lats[0], job_lons[0]
+
+    scalar = [haversine_distance(lat, lon, a, b) for a, b in zip(crew_lats, crew_lons)]
+    batch = haversine_distances(lat, lon, crew_lats, crew_lons)
+    one_to_n_error = float(np.max(np.abs(batch - scalar)))
+
+    matrix = haversine_matrix(job_lats, job_lons, crew_lats, crew_lons)
+    matrix_error = max(
+        abs(matrix[i, j] - haversine_distance(job_lats[i], job_lons[i], crew_lats[j], crew_lons[j]))
+        for i in range(0, JOBS, 20) for j in range(0, CREWS, 50)
+    )
+
+    print(f"1 -> {CREWS} max error: {one_to_n_error:.2e} km")
+    print(f"{JOBS} x {CREWS} max error: {matrix_error:.2e} km")
+
+    runs = 50
+    scalar_time = timeit.timeit(
+        lambda: sorted(haversine_distance(lat, lon, a, b) for a, b in zip(crew_lats, crew_lons)), number=runs
+    ) / runs
+    batch_time = timeit.timeit(
+        lambda: np.argsort(haversine_distances(lat, lon, crew_lats, crew_lons)), number=runs
+    ) / runs
+    matrix_time = timeit.timeit(
+        lambda: haversine_matrix(job_lats, job_lons, crew_lats, crew_lons), number=5
+    ) / 5
+
+    print(f"\nRank {CREWS} crews, scalar: {scalar_time * 1e6:,.0f} µs")
+    print(f"Rank {CREWS} crews, batch:  {batch_time * 1e6:,.0f} µs ({scalar_time / batch_time:.0f}x)")
+    print(f"{JOBS} x {CREWS} matrix:     {matrix_time * 1e3:,.1f} ms")
+
+    if one_to_n_error > TOLERANCE_KM or matrix_error > TOLERANCE_KM:
+        print("\n❌ Batch distances do not match the scalar function")
+        return 1
+    print("\n✅ Batch distances match the scalar function")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Benchmark for batch invoice PDF rendering
+
+Renders a batch of synthetic invoices with the original per-request renderer
+(the old body of generate_invoice_pdf), with render_invoice_pdf in one
+process, and on the process pool, and reports throughput as invoices per
+second and per core. Output is rendered in reportlab's invariant mode so the
+new renderer can be checked byte for byte against the old one. Nothing is
+uploaded.
+"""
+import sys
+import os
+import io
+import time
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.core.invoice_render import InvoiceData, render_invoice_pdf, render_invoices
+
+INVOICES = int(os.getenv("BENCH_INVOICES", "2000"))
+# Each renderer is timed this many times, interleaved, and the best run is reported
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "3"))
+
+# Fixed document ids and dates, so identical drawing gives identical bytes
+rl_config.invariant = 1
+
+
+def baseline_render(data: InvoiceData) -> bytes:
+    """generate_invoice_pdf as it was before the shared renderer, writing to memory"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    # Title
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(50, height - 50, "INVOICE")
+
+    # Invoice details
+    c.setFont("Helvetica", 12)
+    c.drawString(50, height - 100, f"Invoice Number: {data.invoice_number}")
+    c.drawString(50, height - 120, f"Job ID: {data.job_id}")
+    c.drawString(50, height - 140, f"Date: {data.date}")
+
+    # Client details
+    c.drawString(50, height - 180, "Bill To:")
+    c.drawString(50, height - 200, f"{data.client_name}")
+    c.drawString(50, height - 220, f"{data.company_name}")
+    c.drawString(50, height - 240, f"{data.email}")
+
+    # Amount
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, height - 300, f"Total Amount: £{float(data.amount):.2f}")
+
+    # Footer
+    c.setFont("Helvetica", 10)
+    c.drawString(50, 50, "Thank you for your business!")
+
+    c.save()
+    return buffer.getvalue()
+
+
+def sample_invoices(n):
+    return [
+        InvoiceData(
+            invoice_id=f"inv-{i}",
+            invoice_number=f"INV-{i:08d}",
+            job_id=f"job-{i}",
+            date="2026-10-31",
+            client_name=f"Client {i}",
+            company_name="Example Lettings Ltd",
+            email=f"client{i}@example.com",
+            amount=120 + i % 500,
+        )
+        for i in range(n)
+    ]
+
+
+def main() -> int:
+    invoices = sample_invoices(INVOICES)
+    workers = os.cpu_count() or 1
+    renderers = {
+        "baseline": lambda items: [baseline_render(data) for data in items],
+        "serial": lambda items: [render_invoice_pdf(data) for data in items],
+        "pooled": lambda items: render_invoices(items, workers),
+    }
+
+    output, rates = {}, {name: 0.0 for name in renderers}
+    for _ in range(ROUNDS):
+        for name, render in renderers.items():
+            start = time.perf_counter()
+            output[name] = render(invoices)
+            rates[name] = max(rates[name], len(invoices) / (time.perf_counter() - start))
+    baseline, serial, pooled = output["baseline"], output["serial"], output["pooled"]
+    baseline_rate, serial_rate, pooled_rate = rates["baseline"], rates["serial"], rates["pooled"]
+
+    print(f"Invoices: {len(invoices)}, cores: {workers}, best of {ROUNDS} rounds")
+    print(f"Old renderer:   {baseline_rate:,.0f} invoices/s")
+    print(f"Single process: {serial_rate:,.0f} invoices/s ({serial_rate / baseline_rate:.2f}x)")
+    print(f"Process pool:   {pooled_rate:,.0f} invoices/s ({pooled_rate / baseline_rate:.2f}x, {pooled_rate / workers:,.0f} per core)")
+
+    if serial != baseline:
+        print("\n❌ Output differs from the old renderer")
+        return 1
+    if pooled != serial:
+        print("\n❌ Process pool output does not match")
+        return 1
+    print("\n✅ Batch rendering OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
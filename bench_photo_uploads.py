@@ -0,0 +1,106 @@
+"""Benchmark for job photo uploads, one at a time vs concurrently
+
+Uploads BENCH_PHOTOS photos for one job to a local S3 stand-in (moto), first
+one after another with upload_client_job_photo, as job creation used to, and
+then all at once with upload_client_job_photos. Every PutObject is delayed
+by BENCH_UPLOAD_MS to stand in for the round trip to object storage, and one
+photo is refused by the store to check a failed upload is reported without
+losing the others. Nothing is sent to the real bucket.
+
+Needs moto (pip install "moto[s3]"), which the app itself does not use.
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# Credentials and bucket for the stand-in; the real ones are never read
+os.environ.update({
+    "UTHO_ACCESS_KEY": "bench",
+    "UTHO_SECRET_KEY": "bench",
+    "UTHO_BUCKET_NAME": "bench-bucket",
+    "UTHO_REGION": "us-east-1",
+})
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from app.core.storage import storage
+
+PHOTOS = int(os.getenv("BENCH_PHOTOS", "8"))
+PHOTO_KB = int(os.getenv("BENCH_PHOTO_KB", "500"))
+UPLOAD_MS = float(os.getenv("BENCH_UPLOAD_MS", "80"))
+
+CLIENT_ID = "bench-client"
+JOB_ID = "bench-job"
+REFUSED = "refused.jpg"
+
+
+def delay_put(params, **kwargs):
+    """Slow every PutObject down to a network round trip, and refuse one photo"""
+    time.sleep(UPLOAD_MS / 1000)
+    if params["Key"].endswith(REFUSED):
+        raise ClientError({"Error": {"Code": "InternalError", "Message": "Refused by bench"}}, "PutObject")
+
+
+def sample_photos():
+    body = os.urandom(PHOTO_KB * 1024)
+    photos = [(body, f"photo_{i}.jpg") for i in range(PHOTOS - 1)]
+    photos.append((body, REFUSED))
+    return photos
+
+
+def upload_serially(photos):
+    return [
+        (filename, storage.upload_client_job_photo(file_data, CLIENT_ID, JOB_ID, filename))
+        for file_data, filename in photos
+    ]
+
+
+def main() -> int:
+    photos = sample_photos()
+
+    with mock_aws():
+        storage.s3_client = boto3.client("s3", region_name="us-east-1")
+        storage.s3_client.create_bucket(Bucket=storage.bucket_name)
+        storage.s3_client.meta.events.register("before-parameter-build.s3.PutObject", delay_put)
+
+        start = time.perf_counter()
+        serial = upload_serially(photos)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = asyncio.run(storage.upload_client_job_photos(photos, CLIENT_ID, JOB_ID))
+        concurrent_time = time.perf_counter() - start
+
+        stored = storage.s3_client.list_objects_v2(Bucket=storage.bucket_name).get("KeyCount", 0)
+
+    print(f"Photos: {len(photos)} x {PHOTO_KB} KB, upload round trip: {UPLOAD_MS:.0f} ms, workers: {storage.upload_workers}")
+    print(f"One at a time (before): {serial_time * 1000:,.0f} ms")
+    print(f"Concurrent (after):     {concurrent_time * 1000:,.0f} ms ({serial_time / concurrent_time:.1f}x)")
+
+    for name, results in (("serial", serial), ("concurrent", concurrent)):
+        failed = [filename for filename, url in results if url is None]
+        if failed != [REFUSED]:
+            print(f"\n❌ {name} upload reported failures {failed}, expected [{REFUSED!r}]")
+            return 1
+    if [filename for filename, _ in concurrent] != [filename for _, filename in photos]:
+        print("\n❌ Concurrent upload results are out of order")
+        return 1
+    if stored != 2 * (len(photos) - 1):
+        print(f"\n❌ {stored} photos in the bucket, expected {2 * (len(photos) - 1)}")
+        return 1
+    if concurrent_time >= serial_time:
+        print("\n❌ Concurrent upload is not faster")
+        return 1
+    print("\n✅ Photo uploads OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
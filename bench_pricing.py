@@ -0,0 +1,111 @@
+"""Golden price check and micro-benchmark for calculate_job_price
+
+The expected prices below were produced by the pricing code before the rule
+tables were compiled. Both calculate_job_price and the batch
+calculate_job_prices are checked; any change in a price exits non-zero.
+"""
+import sys
+import timeit
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.core.pricing import calculate_job_price, calculate_job_prices
+
+# (property_size, van_loads, waste_type, furniture_items, access_difficulty, urgency, compliance_addons, price)
+GOLDEN = [
+    ('', -1, '', 1, ('lift',), '', ('Deep Sanitation', 'unknown'), 500.0),
+    ('', 1, '', None, ('Stairs', 'Parking', ' long carry ', 'long-carry'), '48h', ('Deep Sanitation', 'unknown'), 950.0),
+    ('', 2, 'garden waste', 0, ('lift',), '48h', ('Deep Sanitation', 'unknown'), 900.0),
+    ('', 7, 'Furniture', 4, ('lift',), '24h', ('Photo Report', 'council pack', 'bio_clean'), 1600.0),
+    ('1 bed', 0, 'Garden_Waste', None, ('Stairs', 'Parking', ' long carry ', 'long-carry'), None, ('Deep Sanitation', 'unknown'), 1000.0),
+    ('1 bed', 2, 'Garden_Waste', 0, None, '24-h', ('Photo Report', 'council pack', 'bio_clean'), 1300.0),
+    ('1 bed', 4, 'garden waste', None, None, '24-h', ('photo',), 1250.0),
+    ('1-bed', -1, 'Hazardous', 0, (), 'same-day', (), 650.0),
+    ('1-bed', 2, 'Furniture', 0, None, 'standard', ('photo',), 700.0),
+    ('1-bed', 4, 'Furniture', 1, ('Stairs', 'Parking', ' long carry ', 'long-carry'), '48h', ('photo',), 1350.0),
+    ('1-bed', 7, 'construction', 1, None, 'same_day', ('Deep Sanitation', 'unknown'), 1700.0),
+    ('2Bed', 1, 'mixed', 0, ('stairs',), '24h', ('photo',), 900.0),
+    ('2Bed', 3, 'garden waste', 0, ('stairs',), '24h', ('photo',), 1300.0),
+    ('2Bed', 7, '', None, None, 'Same Day', ('Photo Report', 'council pack', 'bio_clean'), 1450.0),
+    ('3-bed', 0, 'construction', 0, ('lift',), None, ('photo',), 850.0),
+    ('3-bed', 3, 'general', None, ('Stairs', 'Parking', ' long carry ', 'long-carry'), 'same-day', ('Photo Report', 'council pack', 'bio_clean'), 1750.0),
+    ('4', -1, 'general', 0, (), '24-h', ('Deep Sanitation', 'unknown'), 1150.0),
+    ('4', 1, None, 0, ('stairs',), '48h', ('Photo Report', 'council pack', 'bio_clean'), 1400.0),
+    ('4', 7, 'general', 4, None, None, (), 1350.0),
+    ('4+ bed', 1, 'Garden_Waste', 4, ('Stairs', 'Parking', ' long carry ', 'long-carry'), 'same_day', ('Photo Report', 'council pack', 'bio_clean'), 2000.0),
+    ('4+ bed', 3, 'Furniture', 0, ('stairs',), 'same-day', None, 1300.0),
+    ('4+ bed', 4, 'mixed', None, ('stairs',), 'same-day', (), 1450.0),
+    ('5', -1, 'hoarder', None, ('lift',), '24-h', ('Deep Sanitation', 'unknown'), 1450.0),
+    ('5', 1, 'mixed', 0, ('lift',), 'same_day', ('photo',), 1250.0),
+    ('5', 7, 'construction', 4, ('lift',), 'Same Day', ('Deep Sanitation', 'unknown'), 1800.0),
+    ('6', -1, 'garden waste', None, ('stairs',), 'same-day', ('Photo Report', 'council pack', 'bio_clean'), 850.0),
+    ('6', 2, 'construction', 0, ('lift',), '24-h', ('photo',), 950.0),
+    ('6', 4, '', 1, (), None, ('Deep Sanitation', 'unknown'), 1100.0),
+    ('6', 7, 'Furniture', 0, ('Stairs', 'Parking', ' long carry ', 'long-carry'), 'Same Day', ('Photo Report', 'council pack', 'bio_clean'), 1550.0),
+    ('6', 7, 'mixed', None, ('lift',), '', ('Photo Report', 'council pack', 'bio_clean'), 1250.0),
+    ('Mansion', 0, 'general', 1, ('lift',), 'same_day', ('Photo Report', 'council pack', 'bio_clean'), 950.0),
+    ('Mansion', 2, 'Furniture', 4, (), 'Same Day', ('photo',), 800.0),
+    ('Mansion', 4, 'general', 4, ('Stairs', 'Parking', ' long carry ', 'long-carry'), '24-h', (), 1300.0),
+    ('studio', 0, 'Garden_Waste', 4, ('lift',), None, ('Photo Report', 'council pack', 'bio_clean'), 850.0),
+    ('studio', 2, 'construction', 0, None, '24h', ('photo',), 1050.0),
+    ('studio', 4, 'Garden_Waste', 0, ('stairs',), '', ('Photo Report', 'council pack', 'bio_clean'), 1550.0),
+    (None, -1, 'mixed', 0, None, 'Same Day', ('photo',), 350.0),
+    (None, 0, None, None, (), '48h', ('Photo Report', 'council pack', 'bio_clean'), 650.0),
+    (None, 2, 'mixed', 4, ('stairs',), '48h', ('Deep Sanitation', 'unknown'), 900.0),
+    (None, 4, 'general', 0, None, '', (), 850.0),
+]
+
+
+def as_job(case):
+    size, vans, waste, furniture, access, urgency, compliance = case
+    return {
+        "property_size": size,
+        "van_loads": vans,
+        "waste_type": waste,
+        "furniture_items": furniture,
+        "access_difficulty": list(access) if access else None,
+        "urgency": urgency,
+        "compliance_addons": list(compliance) if compliance else None,
+    }
+
+
+def price(case):
+    return calculate_job_price(**as_job(case))
+
+
+def main() -> int:
+    failures = 0
+    for *case, expected in GOLDEN:
+        actual = price(case)
+        if actual != expected:
+            print(f"❌ {case}: expected {expected}, got {actual}")
+            failures += 1
+
+    batch = calculate_job_prices(as_job(case) for *case, _ in GOLDEN)
+    for (*case, expected), actual in zip(GOLDEN, batch):
+        if actual != expected:
+            print(f"❌ batch {case}: expected {expected}, got {actual}")
+            failures += 1
+
+    runs = 20000
+    case = ("3 bed", 2, "furniture", 4, ("stairs", "parking"), "24h", ("photo_report",))
+    per_quote = timeit.timeit(lambda: price(case), number=runs) / runs
+    print(f"calculate_job_price: {per_quote * 1e6:.2f} µs per quote")
+
+    jobs = [as_job(case) for *case, _ in GOLDEN] * 25
+    loop_time = timeit.timeit(lambda: [calculate_job_price(**job) for job in jobs], number=20) / 20
+    batch_time = timeit.timeit(lambda: calculate_job_prices(jobs), number=20) / 20
+    print(f"{len(jobs)} quotes, one call each: {len(jobs) / loop_time:,.0f} quotes/s")
+    print(f"{len(jobs)} quotes, calculate_job_prices: {len(jobs) / batch_time:,.0f} quotes/s ({loop_time / batch_time:.1f}x)")
+
+    if failures:
+        print(f"\n{failures} golden prices changed")
+        return 1
+    print(f"\n✅ All {len(GOLDEN)} golden prices match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Query plan regression check for the hot client endpoints
+
+Runs EXPLAIN for the queries behind the client job, payment, invoice and
+auth endpoints with sequential scans disabled. If the planner still picks a
+Seq Scan there is no usable index for that access path, and the script
+exits non-zero.
+"""
+import sys
+import json
+from sqlalchemy import text
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.database.db import engine
+
+PARAMS = {
+    "client_id": "00000000-0000-0000-0000-000000000000",
+    "job_id": "00000000-0000-0000-0000-000000000000",
+    "crew_id": "00000000-0000-0000-0000-000000000000",
+    "identifier": "client@example.com",
+}
+
+HOT_QUERIES = {
+    "client jobs by created_at": """
+        SELECT * FROM jobs WHERE client_id = :client_id
+        ORDER BY created_at DESC, id DESC LIMIT 51
+    """,
+    "client jobs by status and updated_at": """
+        SELECT * FROM jobs WHERE client_id = :client_id AND status = 'job_completed'
+        ORDER BY updated_at DESC, id DESC LIMIT 51
+    """,
+    "crew rating": """
+        SELECT AVG(rating) FROM jobs WHERE assigned_crew_id = :crew_id AND rating IS NOT NULL
+    """,
+    "completed deposits for a page of jobs": """
+        SELECT DISTINCT job_id FROM payments
+        WHERE job_id IN (:job_id) AND payment_type = 'deposit' AND payment_status = 'completed'
+    """,
+    "client invoices by generated_at": """
+        SELECT * FROM invoices WHERE client_id = CAST(:client_id AS uuid)
+        ORDER BY generated_at DESC, id DESC LIMIT 51
+    """,
+    "invoice by job": """
+        SELECT * FROM invoices WHERE job_id = :job_id
+    """,
+    "client by email or phone number": """
+        SELECT * FROM clients WHERE email = :identifier OR phone_number = :identifier
+        ORDER BY CASE WHEN email = :identifier THEN 0 ELSE 1 END LIMIT 1
+    """,
+}
+
+
+def plan_node_types(plan: dict):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from plan_node_types(child)
+
+
+def main() -> int:
+    failures = []
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        for name, sql in HOT_QUERIES.items():
+            raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), PARAMS).scalar()
+            plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+            nodes = list(plan_node_types(plan))
+            if "Seq Scan" in nodes:
+                print(f"❌ {name}: {' -> '.join(nodes)}")
+                failures.append(name)
+            else:
+                print(f"✅ {name}: {' -> '.join(nodes)}")
+
+    if failures:
+        print(f"\n{len(failures)} hot queries fall back to a sequential scan")
+        return 1
+    print("\nAll hot queries are index-backed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
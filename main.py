@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
@@ -12,6 +13,8 @@ from app.models.access_difficulty import AccessDifficulty
 from app.models.job import Job
 from app.models.invoice import Invoice
 from app.models.payment import Payment
+from app.models.geocode_cache import GeocodeCache
+from app.models.pricing_rule import PricingRuleSet, PricingRule
 
 # Import database AFTER models are loaded
 from app.database.db import init_db, engine, Base
@@ -31,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(auth.router, prefix="/api/auth")
@@ -129,6 +133,15 @@ def startup():
                 db.add_all(urgency_levels)
                 db.commit()
                 print("✅ Urgency levels added")
+            
+            # Add pricing rules
+            from app.core.pricing_rules import seed_default_pricing
+            if seed_default_pricing(db):
+                print("✅ Pricing rules added")
+            
+            # Drop any snapshot taken before the defaults were seeded
+            from app.core.reference_cache import reference_cache
+            reference_cache.invalidate()
         except Exception as data_error:
             print(f"⚠️ Data initialization failed: {data_error}")
         finally:
@@ -138,6 +151,29 @@ def startup():
         import traceback
         traceback.print_exc()
 
+@app.on_event("startup")
+async def start_background_workers():
+    from app.core.email import mail_sender
+    from app.core.dispatcher import crew_dispatcher
+    from app.core.pricing_rules import pricing_rules_watcher
+    await pricing_rules_watcher.start()
+    await mail_sender.start()
+    await crew_dispatcher.start()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    from app.core.email import mail_sender
+    from app.core.dispatcher import crew_dispatcher
+    # Stop assigning first so its emails are still drained
+    await crew_dispatcher.stop()
+    await mail_sender.stop()
+    from app.core.pricing_rules import pricing_rules_watcher
+    await pricing_rules_watcher.stop()
+    from app.core.sms import sms_sender
+    await asyncio.to_thread(sms_sender.stop)
+    from app.core.security import password_hasher
+    await asyncio.to_thread(password_hasher.stop)
+
 @app.get("/")
 def root():
     return {
@@ -0,0 +1,81 @@
+"""Publish a new version of the pricing rules
+
+Prints the active rules as JSON, or stores the rules from a JSON file as a new
+active version. Every worker picks the new version up without a restart, on
+the Postgres notification or at the latest on its next poll.
+
+Usage:
+    python publish_pricing.py --show > rules.json
+    python publish_pricing.py rules.json --notes "Hazardous waste +£50"
+
+The file maps each category to its prices, e.g.
+    {"urgency": {"standard": 0, "24h": 150, "same_day": 300}}
+Categories left out keep their default prices.
+"""
+import sys
+import json
+import asyncio
+import argparse
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.core.pricing import DEFAULT_RULES
+from app.core.pricing_rules import load_active_pricing, publish_rule_set
+from app.database.db import AsyncSessionLocal, async_engine
+
+
+async def show() -> int:
+    async with AsyncSessionLocal() as db:
+        snapshot = await load_active_pricing(db)
+    if not snapshot:
+        print("❌ No pricing rules have been published yet", file=sys.stderr)
+        return 1
+    print(f"Active pricing rules: version {snapshot.version}", file=sys.stderr)
+    print(json.dumps({category: dict(prices) for category, prices in snapshot.tables.items()}, indent=2))
+    return 0
+
+
+async def publish(path: str, notes: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+
+    unknown = sorted(set(rules) - set(DEFAULT_RULES))
+    if unknown:
+        print(f"❌ Unknown pricing categories: {', '.join(unknown)}")
+        print(f"   Expected some of: {', '.join(DEFAULT_RULES)}")
+        return 1
+
+    async with AsyncSessionLocal() as db:
+        try:
+            snapshot = await publish_rule_set(db, rules, notes=notes)
+        except (TypeError, ValueError, KeyError) as e:
+            print(f"❌ Pricing rules rejected, nothing was stored: {e}")
+            return 1
+    print(f"✅ Pricing rules v{snapshot.version} are now active")
+    return 0
+
+
+async def run(args) -> int:
+    try:
+        if args.show:
+            return await show()
+        return await publish(args.rules, args.notes)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show or publish the pricing rules")
+    parser.add_argument("rules", nargs="?", help="JSON file of category -> option -> price")
+    parser.add_argument("--notes", help="what changed, stored with the version")
+    parser.add_argument("--show", action="store_true", help="print the active rules as JSON")
+    args = parser.parse_args()
+    if not args.show and not args.rules:
+        parser.error("give a rules file to publish, or --show")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Month-end invoice rendering
+
+Renders the PDF of every invoice that does not have one yet, on the process
+pool, uploads the PDFs to object storage and saves their URLs to
+Invoice.pdf_path. Invoices are handled in batches of --batch-size, ordered by
+id; a failed upload leaves pdf_path empty, so the next run picks it up again.
+
+Usage:
+    python render_invoices.py                  # every invoice without a PDF
+    python render_invoices.py --month 2026-10  # only those generated in October 2026
+"""
+import sys
+import argparse
+from datetime import datetime
+
+# Fix Windows encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from sqlalchemy import select
+
+from app.core.invoice_render import render_and_upload_invoices
+from app.database.db import SessionLocal
+from app.models.client import Client
+from app.models.invoice import Invoice
+
+
+def month_range(month: str):
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render and upload missing invoice PDFs")
+    parser.add_argument("--month", help="only invoices generated in this month (YYYY-MM)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default INVOICE_RENDER_WORKERS)")
+    args = parser.parse_args()
+
+    query = (
+        select(Invoice, Client)
+        .join(Client, Client.id == Invoice.client_id)
+        .where(Invoice.pdf_path.is_(None))
+        .order_by(Invoice.id)
+        .limit(args.batch_size)
+    )
+    if args.month:
+        start, end = month_range(args.month)
+        query = query.where(Invoice.generated_at >= start, Invoice.generated_at < end)
+
+    rendered = failed = 0
+    last_id = None
+    with SessionLocal() as db:
+        while True:
+            batch = db.execute(query if last_id is None else query.where(Invoice.id > last_id)).all()
+            if not batch:
+                break
+            last_id = batch[-1][0].id
+
+            urls = render_and_upload_invoices(batch, args.workers)
+            for invoice, _ in batch:
+                url = urls.get(str(invoice.id))
+                if url:
+                    invoice.pdf_path = url
+                    rendered += 1
+                else:
+                    failed += 1
+            db.commit()
+            print(f"Rendered {rendered} invoices, {failed} failed")
+
+    if failed:
+        print(f"\n❌ {failed} invoice PDFs could not be uploaded; run again to retry them")
+        return 1
+    print(f"\n✅ {rendered} invoice PDFs rendered and uploaded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())